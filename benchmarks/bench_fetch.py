@@ -0,0 +1,103 @@
+"""Mesure les rafraîchissements de l'export face au serveur local (serveur_csv).
+
+Compare urllib (une connexion et un parsing complet par rafraîchissement) au
+fetcher poolé et conditionnel, avec et sans validateurs côté serveur, puis le
+téléchargement séquentiel et parallèle de plusieurs feuilles de cohorte (le
+serveur ajoute alors --latence par réponse, comme un serveur distant).
+
+    python benchmarks/bench_fetch.py [--lignes 100000] [--rafraichissements 10]
+        [--cohortes 8] [--latence 0.2]
+"""
+import argparse
+import io
+import logging
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE))
+sys.path.insert(0, str(RACINE / "benchmarks"))
+
+from generateur import ecrire_csv  # noqa: E402
+from serveur_csv import creer_serveur  # noqa: E402
+from src import cache  # noqa: E402
+from src.data_loader import normalize_columns  # noqa: E402
+from src.fetcher import SheetFetcher, fetcher  # noqa: E402
+
+
+def demarrer(chemin: Path, validateurs: bool, latence: float = 0.0):
+    serveur = creer_serveur(chemin, validateurs=validateurs, latence=latence)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur, f"http://127.0.0.1:{serveur.server_address[1]}/export.csv"
+
+
+def rafraichir_urllib(url: str, n: int) -> float:
+    debut = time.perf_counter()
+    for _ in range(n):
+        with urllib.request.urlopen(url, timeout=10) as reponse:
+            normalize_columns(pd.read_csv(io.BytesIO(reponse.read())))
+    return time.perf_counter() - debut
+
+
+def rafraichir_fetcher(url: str, n: int, dossier: Path) -> tuple[float, float]:
+    # Premier appel à part : il paie le parsing et le prétraitement.
+    fetcher.clear()
+    cache._en_memoire.clear()
+    debut = time.perf_counter()
+    cache.load_url(url, dossier)
+    premier = time.perf_counter() - debut
+    debut = time.perf_counter()
+    for _ in range(n - 1):
+        cache.load_url(url, dossier)
+    return premier, time.perf_counter() - debut
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lignes", type=int, default=100_000)
+    parser.add_argument("--rafraichissements", type=int, default=10)
+    parser.add_argument("--cohortes", type=int, default=8)
+    parser.add_argument("--latence", type=float, default=0.2)
+    args = parser.parse_args()
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        chemin = ecrire_csv(args.lignes, tmp / "export.csv")
+        n = args.rafraichissements
+
+        serveur, url = demarrer(chemin, validateurs=False)
+        t = rafraichir_urllib(url, n)
+        print(f"urllib + read_csv         {n} rafraîchissements : {t:7.3f}s  {serveur.stats}")
+        serveur.shutdown()
+
+        for validateurs in (False, True):
+            serveur, url = demarrer(chemin, validateurs)
+            nom = "fetcher, ETag" if validateurs else "fetcher, sha256"
+            premier, suite = rafraichir_fetcher(url, n, tmp / nom)
+            print(f"{nom:<25} 1er : {premier:7.3f}s, {n - 1} suivants : {suite:7.3f}s  {serveur.stats}")
+            serveur.shutdown()
+
+        cohorte = ecrire_csv(1_000, tmp / "cohorte.csv")
+        serveur, url = demarrer(cohorte, validateurs=True, latence=args.latence)
+        urls = [f"{url}?cohorte={i}" for i in range(args.cohortes)]
+        debut = time.perf_counter()
+        for u in urls:
+            urllib.request.urlopen(u, timeout=10).read()
+        sequentiel = time.perf_counter() - debut
+        debut = time.perf_counter()
+        reponses = SheetFetcher().fetch_many(urls)
+        parallele = time.perf_counter() - debut
+        assert all(not isinstance(r, OSError) for r in reponses.values())
+        print(f"{args.cohortes} cohortes : séquentiel {sequentiel:.3f}s, fetch_many {parallele:.3f}s")
+        serveur.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Mesure le pipeline complet (chargement, nettoyage, rapport, figures) par taille.
+
+Chaque étape est chronométrée puis rejouée sous tracemalloc pour le pic
+mémoire. Les résultats sont écrits en JSON ; avec --baseline, ils sont
+comparés à une mesure de référence et le script sort en erreur si une étape
+a régressé au-delà de --tolerance.
+
+    python benchmarks/bench_pipeline.py [--tailles 1000 10000 100000 1000000] [--http]
+        [--chunk 50000] [--sortie resultats.json] [--baseline reference.json] [--tolerance 0.2]
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE))
+sys.path.insert(0, str(RACINE / "benchmarks"))
+
+from generateur import ecrire_csv  # noqa: E402
+from serveur_csv import creer_serveur  # noqa: E402
+from src import data_loader, preprocessing  # noqa: E402
+from src.bootstrap import bootstrap_corr  # noqa: E402
+from src.correlation import permutation_pvalues, rank_correlation  # noqa: E402
+from src.data_loader import load_data  # noqa: E402
+from src.fetcher import fetcher  # noqa: E402
+from src.metrics import PAIRES_CONCLUSIONS  # noqa: E402
+from src.figure_cache import render_png  # noqa: E402
+from src.preprocessing import build_rapport, preprocess  # noqa: E402
+from src.streaming import preprocess_stream  # noqa: E402
+from src.visualizations import (  # noqa: E402
+    plot_scatter_sommeil_productivite,
+    plot_distributions,
+    plot_sommeil_efficacite_kde,
+    plot_sport_productivite_energie,
+    plot_definition_productivite,
+    plot_pairplot,
+    plot_correlation,
+)
+
+PLOTS_DF = (
+    plot_scatter_sommeil_productivite,
+    plot_sommeil_efficacite_kde,
+    plot_sport_productivite_energie,
+    plot_definition_productivite,
+    plot_pairplot,
+)
+
+# En dessous de ce temps, les écarts relatifs sont du bruit de mesure.
+SECONDES_MIN = 0.05
+
+
+def _a_froid() -> None:
+    # Aucune mémoïsation ne doit survivre d'une mesure à l'autre.
+    load_data.clear()
+    data_loader._lectures.clear()
+    fetcher.clear()
+    preprocess.clear()
+    preprocessing._vocabulaires.clear()
+
+
+def mesurer(fn, *args) -> tuple[dict, object]:
+    _a_froid()
+    debut, cpu = time.perf_counter(), time.process_time()
+    res = fn(*args)
+    secondes, cpu = time.perf_counter() - debut, time.process_time() - cpu
+
+    del res
+    _a_froid()
+    tracemalloc.start()
+    try:
+        res = fn(*args)
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"secondes": round(secondes, 4), "cpu": round(cpu, 4), "pic_octets": pic}, res
+
+
+def mesurer_taille(n: int, dossier: Path, http: bool, seed: int, chunk: int) -> list[dict]:
+    chemin = ecrire_csv(n, dossier / f"export_{n}.csv", seed)
+    serveur = None
+    if http:
+        serveur = creer_serveur(chemin)
+        threading.Thread(target=serveur.serve_forever, daemon=True).start()
+        data_loader.URL = f"http://127.0.0.1:{serveur.server_address[1]}/export.csv"
+    else:
+        data_loader.URL = str(chemin)
+
+    resultats = []
+
+    def noter(etape: str, fn, *args):
+        mesure, res = mesurer(fn, *args)
+        resultats.append({"etape": etape, "lignes": n, **mesure})
+        print(f"{n:>9} {etape:<36} {mesure['secondes']:>9.3f}s {mesure['pic_octets'] / 2**20:>9.1f} Mo")
+        return res
+
+    try:
+        df_raw = noter("load_data", load_data)
+    finally:
+        if serveur is not None:
+            serveur.shutdown()
+    df, corr, p_values, profil = noter("preprocess", preprocess, df_raw)
+    del df_raw
+    noter("preprocess_stream", preprocess_stream, chemin, chunk)
+    noter("build_rapport", build_rapport, profil)
+    noter("bootstrap_conclusions", bootstrap_corr, df, PAIRES_CONCLUSIONS)
+    noter("permutation_pvalues", permutation_pvalues, df[list(corr.columns)])
+    for methode in ("spearman", "kendall"):
+        noter(f"corr_{methode}", rank_correlation, df[list(corr.columns)], methode)
+    noter(plot_distributions.__name__, lambda: render_png(plot_distributions(df, profil)))
+    for fn in PLOTS_DF:
+        noter(fn.__name__, lambda: render_png(fn(df)))
+    noter(plot_correlation.__name__, lambda: render_png(plot_correlation(corr, p_values)))
+    return resultats
+
+
+def comparer(resultats: list[dict], reference: list[dict], tolerance: float) -> list[str]:
+    index = {(r["etape"], r["lignes"]): r for r in reference}
+    regressions = []
+    for r in resultats:
+        ref = index.get((r["etape"], r["lignes"]))
+        if ref is None:
+            continue
+        if r["secondes"] >= SECONDES_MIN and r["secondes"] > ref["secondes"] * (1 + tolerance):
+            regressions.append(
+                f"{r['etape']} @ {r['lignes']} : {ref['secondes']:.3f}s -> {r['secondes']:.3f}s"
+            )
+        if r["pic_octets"] > ref["pic_octets"] * (1 + tolerance):
+            regressions.append(
+                f"{r['etape']} @ {r['lignes']} : {ref['pic_octets'] / 2**20:.1f} Mo "
+                f"-> {r['pic_octets'] / 2**20:.1f} Mo"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--http", action="store_true", help="servir l'export via serveur_csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=50_000, help="lignes par morceau (preprocess_stream)")
+    parser.add_argument("--sortie", type=Path, default=Path("bench_pipeline.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    resultats = []
+    with tempfile.TemporaryDirectory() as dossier:
+        for n in args.tailles:
+            resultats += mesurer_taille(n, Path(dossier), args.http, args.seed, args.chunk)
+
+    rapport = {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "source": "http" if args.http else "fichier",
+        "resultats": resultats,
+    }
+    args.sortie.write_text(json.dumps(rapport, indent=2, ensure_ascii=False))
+    print(f"-> {args.sortie}")
+
+    if args.baseline:
+        reference = json.loads(args.baseline.read_text())["resultats"]
+        regressions = comparer(resultats, reference, args.tolerance)
+        for ligne in regressions:
+            print(f"RÉGRESSION {ligne}")
+        if regressions:
+            sys.exit(1)
+        print(f"Aucune régression (tolérance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
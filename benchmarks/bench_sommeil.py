@@ -0,0 +1,55 @@
+"""Compare le parseur de sommeil ligne à ligne et la version vectorisée.
+
+    python benchmarks/bench_sommeil.py [--tailles 10000 100000 1000000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE))
+
+from src.preprocessing import _convertir_sommeil, _convertir_sommeil_serie  # noqa: E402
+
+REPONSES_SUPPLEMENTAIRES = [
+    "06:00", "7 ou 8h", "six heures", "Environ six heures ", "7 à 8 heures",
+    "huit", "5h30", "6.5", "6,5", "douze", None,
+]
+
+
+def vocabulaire() -> list:
+    brut = pd.read_csv(RACINE / "data" / "data.csv")
+    reponses = pd.concat([brut.iloc[:, 2], brut.iloc[:, 3]]).tolist()
+    return reponses + REPONSES_SUPPLEMENTAIRES
+
+
+def chronometrer(fn, *args) -> tuple[float, pd.Series]:
+    debut = time.perf_counter()
+    res = fn(*args)
+    return time.perf_counter() - debut, res
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vocab = np.array(vocabulaire(), dtype=object)
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'lignes':>10} {'apply (s)':>11} {'vectorisé (s)':>14} {'gain':>7}")
+    for n in args.tailles:
+        serie = pd.Series(vocab[rng.integers(0, len(vocab), n)])
+        t_apply, attendu = chronometrer(serie.apply, _convertir_sommeil)
+        t_vect, obtenu = chronometrer(_convertir_sommeil_serie, serie)
+        pd.testing.assert_series_equal(obtenu, attendu.astype("float64"), check_names=False)
+        print(f"{n:>10} {t_apply:>11.3f} {t_vect:>14.3f} {t_apply / t_vect:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
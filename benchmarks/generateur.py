@@ -0,0 +1,141 @@
+"""Génère un export brut synthétique du questionnaire, à n'importe quelle taille.
+
+Les en-têtes sont ceux de RENAME_MAP, avec les espaces parasites et les
+apostrophes typographiques de l'export Google Sheets ; les réponses
+reproduisent les formats rencontrés dans data/data.csv ("06:00", "7h",
+"six heures", eau en millilitres, échelles de Likert en texte ou en chiffres).
+
+    python benchmarks/generateur.py 100000 -o /tmp/export.csv [--seed 0]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE))
+
+from src.data_loader import RENAME_MAP  # noqa: E402
+from src.preprocessing import FREQ_MAP, PROD_MAP, STRESS_MAP  # noqa: E402
+
+# Part des réponses laissées vides, sur les colonnes facultatives.
+TAUX_MANQUANTS = 0.02
+
+# Réponse -> poids relatif ; une clé None donne une cellule vide.
+REPONSES = {
+    "Definition_productivite": {
+        "Travailler vite et efficacement": 4,
+        "Accomplir toutes ses tâches de la journée": 4,
+        "Avoir l'esprit calme et concentré": 2,
+        "Réussir à équilibrer travail et vie perso": 2,
+        "C'est de réussir à accomplir ses tâches dans un temps respectable ": 1,
+    },
+    "Sommeil": {
+        "06:00": 8, "05:00": 6, "07:00": 5, "08:00": 2, "10:00": 1, "17:00": 1,
+        "6": 5, "5": 4, "7": 3, "4": 2, "8": 1, "10": 1,
+        "6h": 4, "5h": 3, "7h": 3, "4h": 1, "3h30": 1, "4h40": 1, "5 h ": 1,
+        "6 heures": 3, "6 heures ": 2, "7 heures": 1, "6heures": 1,
+        "6 hres": 1, "7 hres ": 1, "6 hrs ": 1, "6 heure de temps": 1,
+        "six heures": 2, "Environ six heures ": 1, "huit": 1, "cinq": 1,
+        "5 à 6": 2, "5à6h": 1, "4-5": 1, "5- 6h ": 1, "3 à 5h": 1,
+        "4 a 5 heures ": 1, "7 ou 8h": 1, "5 à 8 heures ": 1,
+        "5,5": 1, "6.5": 1, "douze": 1,
+    },
+    "Sommeil_reparateur": {**{k: 3 for k in FREQ_MAP}, "Jamais": 1},
+    "Hygiene_vie": {"Moyenne": 5, "Très bonne": 2, "Pas terrible": 2},
+    "Frequence_sport": {
+        "1 à 2 fois par semaine": 5, "Jamais": 3,
+        "3 à 4 fois par semaine": 2, "Tous les jours": 1,
+    },
+    # Litres, mais aussi des millilitres ("1500") et des saisies aberrantes.
+    "Eau_litres": {
+        "1": 5, "2": 6, "3": 3, "4": 1, "5": 1, "6": 1, "8": 1,
+        "1.5": 2, "2,5": 1, "500": 1, "1500": 2, "2000": 1, "1000000000000": 1,
+    },
+    "Cafe": {"0": 5, "1": 6, "2": 3, "3": 1, "4": 1, "5": 1, "1E+21": 1},
+    "Efficacite_aujourdhui": {
+        **{k: 3 for k in PROD_MAP},
+        "Propre (Efficacité correcte, boulot fait)": 8,
+        "Mode déter (Efficacité maximale/Machine)": 1,
+    },
+    # Likert mixte : chiffres et libellés texte dans la même colonne.
+    "Stress": {
+        "1": 2, "2": 4, "3": 5, "4": 3, "5": 1,
+        **{k: 1 for k in STRESS_MAP},
+    },
+    "Likert": {"1": 1, "2": 3, "3": 5, "4": 4, "5": 2},
+    "Age": {"18-25 ans": 8, "26-45 ans": 3, "plus de 45 ans": 1},
+    "Situation": {
+        "Étudiant(e)": 8, "Travailleur / Travailleuse": 3, "En recherche d'emploi": 1,
+        "Les deux ": 1, "Chômé ": 1, "chomeur récalcitrant ": 1,
+    },
+}
+
+COLONNES = {
+    "Definition_productivite": "Definition_productivite",
+    "Sommeil_moyen":           "Sommeil",
+    "Sommeil_nuit_derniere":   "Sommeil",
+    "Sommeil_reparateur":      "Sommeil_reparateur",
+    "Hygiene_vie":             "Hygiene_vie",
+    "Frequence_sport":         "Frequence_sport",
+    "Eau_litres":              "Eau_litres",
+    "Cafe":                    "Cafe",
+    "Efficacite_aujourdhui":   "Efficacite_aujourdhui",
+    "Stress":                  "Stress",
+    "Productivite_7j":         "Likert",
+    "Energie":                 "Likert",
+    "Age":                     "Age",
+    "Situation":               "Situation",
+}
+
+FACULTATIVES = {"Sommeil_moyen", "Sommeil_nuit_derniere", "Eau_litres", "Cafe", "Stress"}
+
+DEBUT = pd.Timestamp("2026-02-25 08:00:00")
+
+
+def entete_brut(entete: str) -> str:
+    # Comme l'export : espaces de fin et apostrophes typographiques.
+    if "energie" in entete:
+        entete = entete.replace("'", "’")
+    return entete + "  "
+
+
+def _tirer(rng: np.random.Generator, reponses: dict, n: int) -> np.ndarray:
+    valeurs = np.array(list(reponses), dtype=object)
+    poids = np.fromiter(reponses.values(), dtype="float64")
+    return valeurs[rng.choice(len(valeurs), size=n, p=poids / poids.sum())]
+
+
+def generer(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    secondes = np.sort(rng.integers(0, 30 * 24 * 3600, n))
+    colonnes = {"Timestamp": (DEBUT + pd.to_timedelta(secondes, unit="s")).strftime("%d/%m/%Y %H:%M:%S")}
+    for col, vocab in COLONNES.items():
+        valeurs = _tirer(rng, REPONSES[vocab], n)
+        if col in FACULTATIVES:
+            valeurs[rng.random(n) < TAUX_MANQUANTS] = None
+        colonnes[col] = valeurs
+
+    entetes = {v: entete_brut(k) for k, v in RENAME_MAP.items()}
+    return pd.DataFrame(colonnes).rename(columns=entetes)
+
+
+def ecrire_csv(n: int, chemin: Path, seed: int = 0) -> Path:
+    generer(n, seed).to_csv(chemin, index=False)
+    return chemin
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("lignes", type=int)
+    parser.add_argument("-o", "--sortie", type=Path, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    ecrire_csv(args.lignes, args.sortie, args.seed)
+    print(args.sortie)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Serveur HTTP local qui remplace l'export Google Sheets pendant les tests.
+
+Chaque requête GET renvoie l'en-tête du CSV suivi des `--depart` premières
+lignes, puis de `--croissance` lignes de plus à chaque requête suivante : on
+simule ainsi un formulaire qui reçoit de nouvelles réponses.
+
+Les connexions sont gardées ouvertes (HTTP/1.1). Avec `--validateurs`, le
+serveur envoie ETag et Last-Modified et répond 304 aux requêtes
+conditionnelles dont le corps n'a pas changé. `--latence` retarde chaque
+réponse pour imiter un serveur distant. `serveur.stats` compte les requêtes,
+les connexions et les 304.
+
+    python benchmarks/serveur_csv.py data/data.csv --port 8765 --depart 20 --croissance 5
+        [--validateurs] [--latence 0.05]
+"""
+import argparse
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def creer_serveur(
+    chemin: Path, port: int = 0, depart: int = 0, croissance: int = 0,
+    validateurs: bool = False, latence: float = 0.0,
+) -> ThreadingHTTPServer:
+    entete, *lignes = Path(chemin).read_bytes().splitlines(keepends=True)
+    etat = {"visibles": depart or len(lignes), "etag": None, "modifie": None}
+    stats = {"requetes": 0, "connexions": 0, "non_modifies": 0}
+    verrou = threading.Lock()
+
+    class Gestionnaire(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with verrou:
+                stats["connexions"] += 1
+
+        def do_GET(self):
+            time.sleep(latence)
+            with verrou:
+                stats["requetes"] += 1
+                visibles = min(etat["visibles"], len(lignes))
+                etat["visibles"] += croissance
+                corps = entete + b"".join(lignes[:visibles])
+                etag = '"' + hashlib.sha1(corps).hexdigest() + '"'
+                if etag != etat["etag"]:
+                    etat["etag"], etat["modifie"] = etag, formatdate(time.time(), usegmt=True)
+                modifie = etat["modifie"]
+
+            if validateurs and self.headers.get("If-None-Match") == etag:
+                with verrou:
+                    stats["non_modifies"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv; charset=utf-8")
+            self.send_header("Content-Length", str(len(corps)))
+            if validateurs:
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", modifie)
+            self.end_headers()
+            self.wfile.write(corps)
+
+        def log_message(self, *args):
+            pass
+
+    serveur = ThreadingHTTPServer(("127.0.0.1", port), Gestionnaire)
+    serveur.stats = stats
+    return serveur
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv", type=Path)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--depart", type=int, default=0)
+    parser.add_argument("--croissance", type=int, default=0)
+    parser.add_argument("--validateurs", action="store_true")
+    parser.add_argument("--latence", type=float, default=0.0)
+    args = parser.parse_args()
+
+    serveur = creer_serveur(
+        args.csv, args.port, args.depart, args.croissance, args.validateurs, args.latence,
+    )
+    print(f"http://127.0.0.1:{serveur.server_address[1]}/export.csv")
+    serveur.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import streamlit as st
-from scipy import stats as scipy_stats
 
-from src.data_loader import load_data
-from src.preprocessing import preprocess, build_rapport
+from src.cache import load_cached
+from src.bootstrap import TIRAGES
+from src.correlation import METHODE, pearson_pvalues, rank_correlation
+from src.ingestion import INCREMENTAL, load_incremental
 from src.visualizations import (
     plot_scatter_sommeil_productivite,
     plot_distributions,
@@ -11,8 +12,14 @@ from src.visualizations import (
     plot_definition_productivite,
     plot_pairplot,
     plot_correlation,
+    COEFFICIENTS,
+    SPORT_LABELS,
 )
-from src.components import kpi_row, section_header, rapport_table
+from src.components import kpi_row, section_header, rapport_table, spans_table
+from src.figure_cache import cached_png
+from src.instrumentation import end_rerun, span, start_rerun
+from src.metrics import registry
+from src.prerender import warm_up
 
 st.set_page_config(
     page_title="PyFusion — Santé & Productivité",
@@ -159,25 +166,26 @@ st.markdown("""
 
 LOGO_URL = "https://images.squarespace-cdn.com/content/v1/604f4f7bdad32a12b24382e6/8350aaa8-4e63-4176-90f1-c6ce04a63f56/Cover_ESIH-29.jpg?format=1500w"
 
-df_raw                  = load_data()
-df, df_normalized, corr = preprocess(df_raw)
-rapport_df              = build_rapport(df)
+start_rerun()
 
-n                    = len(df)
-age_predominant      = df["Age"].mode()[0]
-situation_top        = df["Situation"].mode()[0]
-situation_pct        = round(df["Situation"].value_counts(normalize=True).iloc[0] * 100)
-sommeil_moy          = round(df["Sommeil_moyen"].mean(), 1)
-stress_moy           = round(df["Stress"].mean(), 2)
-prod_moy             = round(df["Productivite_7j"].mean(), 2)
+# Sans span enfant, les données venaient du cache st.cache_data.
+with span("load_incremental" if INCREMENTAL else "load_cached") as s:
+    if INCREMENTAL:
+        (df, corr, p_values, profil), version = load_incremental()
+    else:
+        (df, corr, p_values, profil), version = load_cached()
+    s.cache = "miss" if s.enfants else "hit"
 
-sport_labels_map     = {0: "Jamais", 1: "1-2x/sem", 2: "3-4x/sem", 3: "5+x/sem", 4: "Quotidien"}
-sport_prod           = df.groupby("Frequence_sport")["Productivite_7j"].mean()
-meilleur_sport_label = sport_labels_map.get(int(sport_prod.idxmax()), "N/A")
+# Métriques dérivées calculées à la demande, page par page, et mémoïsées
+# pour cette version des données (le hash du CSV brut, déjà calculé au
+# chargement).
+m = registry.bind(version, df=df, profil=profil, corr=corr, p_values=p_values, selection={})
 
-r_sommeil_prod, p_sommeil_prod = scipy_stats.pearsonr(df["Sommeil_moyen"], df["Productivite_7j"])
-r_stress_eff,   p_stress_eff   = scipy_stats.pearsonr(df["Stress"], df["Efficacite_aujourdhui"])
-r_eau_energie,  p_eau_energie  = scipy_stats.pearsonr(df["Eau_litres"], df["Energie"])
+# Nouvelle version des données : toutes les figures sont pré-rendues en
+# arrière-plan pour que les changements de page soient servis depuis le cache.
+warm_up(version, df=df, corr=corr, p_values=p_values, profil=profil)
+# Les intervalles bootstrap de la page Conclusions aussi.
+registry.warm_up(version, df=df, profil=profil, corr=corr, p_values=p_values, selection={})
 
 PAGES = {
     "Introduction":              "intro",
@@ -191,6 +199,16 @@ PAGES = {
     "Conclusions":               "conclusions",
 }
 
+FILTRES_LIBELLES = {
+    "Age":                     "Âge",
+    "Situation":               "Situation",
+    "Frequence_sport":         "Fréquence de sport",
+    "Definition_productivite": "Définition de la productivité",
+}
+
+# En dessous de cet effectif, r, p-values et intervalles ne sont pas définis.
+EFFECTIF_MIN_CORRELATION = 3
+
 with st.sidebar:
     st.markdown(
         f"""
@@ -219,16 +237,62 @@ with st.sidebar:
     )
     st.markdown("<hr style='border-color:#A41E37;margin:0.8rem 0;'>", unsafe_allow_html=True)
     page = st.radio("Navigation", list(PAGES.keys()), label_visibility="collapsed")
+    st.markdown("<hr style='border-color:#eee;margin:0.8rem 0;'>", unsafe_allow_html=True)
+    selection = {}
+    for f, modalites in m["filtres"].items():
+        valeurs = st.multiselect(
+            FILTRES_LIBELLES.get(f, f),
+            modalites,
+            format_func=(lambda v: SPORT_LABELS.get(v, str(v))) if f == "Frequence_sport" else str,
+            placeholder="Toutes",
+        )
+        if valeurs:
+            selection[f] = valeurs
+
+# Cohorte : KPIs, rapport et corrélations viennent des cellules du cube,
+# seules les lignes nécessaires aux graphiques sont extraites via les bitmaps.
+# Le cube n'est construit qu'à la première sélection (ou par les métriques
+# qui en dépendent), pas à chaque rerun.
+if selection:
+    cube = m["cube"]
+    with span("cohorte"):
+        moments  = cube.moments(selection)
+        df       = df[cube.mask(selection)]
+        if METHODE == "pearson":
+            corr     = moments.corr()
+            p_values = pearson_pvalues(corr, moments.counts())
+        else:
+            corr, p_values = rank_correlation(df[list(corr.columns)], METHODE)
+        profil   = cube.profile(selection, moments)
+    version = f"{version}:{selection!r}"
+    m = registry.bind(
+        version,
+        df=df, profil=profil, corr=corr, p_values=p_values, cube=cube, selection=selection,
+    )
+n = m["n"]
+
+if not n:
+    st.warning("Aucun répondant ne correspond à cette cohorte.")
+    end_rerun(page=PAGES[page])
+    st.stop()
+
+with st.sidebar:
     st.markdown("<hr style='border-color:#eee;margin:0.8rem 0;'>", unsafe_allow_html=True)
     st.markdown(
         f"<div style='font-size:0.78rem;color:#777;text-align:center;'>"
-        f"Données en temps réel · n={n} répondants"
+        f"Données en temps réel · n={n} répondants{' (cohorte)' if selection else ''}"
         f"</div>",
         unsafe_allow_html=True,
     )
 
 section = PAGES[page]
 
+def info_effectif():
+    st.info(
+        f"Cohorte de {n} répondant{'s' if n > 1 else ''} : il en faut au moins "
+        f"{EFFECTIF_MIN_CORRELATION} pour estimer une corrélation."
+    )
+
 def footer():
     st.markdown(
         f"<div class='footer'>PyFusion · <span>Python orientée Data</span> · M1/ESIH · n={n} répondants</div>",
@@ -236,6 +300,10 @@ def footer():
     )
 
 if section == "intro":
+    age_predominant = m["age_predominant"]
+    situation_top   = m["situation_top"]
+    situation_pct   = m["situation_pct"]
+
     st.markdown(
         f"""
         <div class="header-band">
@@ -323,14 +391,18 @@ if section == "intro":
     footer()
 
 elif section == "vue":
+    age_predominant = m["age_predominant"]
+    situation_top   = m["situation_top"]
+    situation_pct   = m["situation_pct"]
+
     section_header(
         "Vue générale",
         f"Analyse de {n} répondants — majorité {age_predominant} ({situation_top} : {situation_pct}%)",
     )
-    kpi_row(df)
+    kpi_row(profil, n)
     st.divider()
     st.subheader("Distributions des variables clés")
-    st.pyplot(plot_distributions(df))
+    st.image(cached_png(plot_distributions, df, profil, version=version), width="stretch")
     footer()
 
 elif section == "sommeil":
@@ -340,9 +412,12 @@ elif section == "sommeil":
     )
     col1, col2 = st.columns(2)
     with col1:
-        st.pyplot(plot_scatter_sommeil_productivite(df))
+        if n < EFFECTIF_MIN_CORRELATION:
+            info_effectif()
+        else:
+            st.image(cached_png(plot_scatter_sommeil_productivite, df, version=version), width="stretch")
     with col2:
-        st.pyplot(plot_sommeil_efficacite_kde(df))
+        st.image(cached_png(plot_sommeil_efficacite_kde, df, version=version), width="stretch")
     footer()
 
 elif section == "sport":
@@ -350,7 +425,7 @@ elif section == "sport":
         "Sport & Energie",
         "Impact de la fréquence d'activité physique sur la productivité et l'énergie",
     )
-    st.pyplot(plot_sport_productivite_energie(df))
+    st.image(cached_png(plot_sport_productivite_energie, df, version=version), width="stretch")
     footer()
 
 elif section == "definition":
@@ -358,7 +433,7 @@ elif section == "definition":
         "Définition & Productivité",
         "La vision de la productivité influence-t-elle les résultats réels ?",
     )
-    st.pyplot(plot_definition_productivite(df))
+    st.image(cached_png(plot_definition_productivite, df, version=version), width="stretch")
     footer()
 
 elif section == "pairplot":
@@ -367,18 +442,39 @@ elif section == "pairplot":
         "Vue globale des relations entre sommeil, stress, énergie et productivité",
     )
     st.info("Chaque point représente un répondant. La couleur indique l'efficacité ressentie.")
-    st.pyplot(plot_pairplot(df))
+    st.image(cached_png(plot_pairplot, df, version=version), width="stretch")
     footer()
 
 elif section == "corr":
     section_header(
         "Matrice de Corrélation",
-        "Corrélations de Pearson entre toutes les variables — seuil de significativité p < 0.05",
+        f"Corrélations ({COEFFICIENTS[METHODE]}) entre toutes les variables — seuil de significativité p < 0.05",
     )
-    st.pyplot(plot_correlation(corr, df_normalized))
+    if n < EFFECTIF_MIN_CORRELATION:
+        info_effectif()
+    else:
+        # Le test de permutation porte sur r (ou sur r des rangs) : rien pour Kendall.
+        significativite = st.radio(
+            "Significativité",
+            ["pearson"] if METHODE == "kendall" else ["pearson", "permutation"],
+            format_func={"pearson": "Test paramétrique", "permutation": "Test de permutation"}.get,
+            horizontal=True,
+        )
+        if significativite == "permutation":
+            st.image(cached_png(plot_correlation, corr, m["p_permutation"], significativite="permutation", version=version), width="stretch")
+        else:
+            st.image(cached_png(plot_correlation, corr, p_values, version=version), width="stretch")
+        if st.toggle("Intervalles de confiance bootstrap du r de Pearson (toutes les paires)"):
+            st.dataframe(
+                m["ic_corr"].style.format("{:.2f}"),
+                width="stretch",
+            )
+            st.caption(f"Intervalles à 95 % par percentiles, {TIRAGES} rééchantillons des répondants.")
     footer()
 
 elif section == "rapport":
+    rapport_df = m["rapport"]
+
     section_header(
         "Rapport statistique",
         f"Moyennes des indicateurs clés — échantillon de {n} répondants",
@@ -391,32 +487,18 @@ elif section == "rapport":
     footer()
 
 elif section == "conclusions":
+    sommeil_moy          = m["sommeil_moy"]
+    prod_moy             = m["prod_moy"]
+    meilleur_sport_label = m["meilleur_sport_label"]
+    conclusions          = m["conclusions"]
+    sommeil_status, sommeil_color, sommeil_desc = conclusions["sommeil"]
+    stress_status,  stress_color,  stress_desc  = conclusions["stress"]
+
     section_header(
         "Conclusions & Recommandations",
         f"Analyse automatisée basée sur n={n} répondants",
     )
 
-    # --- LOGIQUE D'INTERPRÉTATION DYNAMIQUE ---
-    # Sommeil
-    if p_sommeil_prod < 0.05:
-        sommeil_status = "Significatif"
-        sommeil_color = "success"
-        sommeil_desc = f"Le sommeil influence directement la productivité (r={r_sommeil_prod:.2f})."
-    else:
-        sommeil_status = "Non significatif"
-        sommeil_color = "warning"
-        sommeil_desc = "Le groupe maintient sa productivité malgré la fatigue (effort de volonté)."
-
-    # Stress
-    if p_stress_eff < 0.05:
-        stress_status = "Impact Critique"
-        stress_color = "error"
-        stress_desc = f"Le stress dégrade l'efficacité (r={r_stress_eff:.2f})."
-    else:
-        stress_status = "Sous contrôle"
-        stress_color = "success"
-        stress_desc = "Le stress actuel n'impacte pas encore l'efficacité de manière majeure."
-
     # --- AFFICHAGE ---
     st.markdown("### 1. Diagnostic de l'échantillon")
     col1, col2, col3 = st.columns(3)
@@ -434,37 +516,44 @@ elif section == "conclusions":
     c1, c2 = st.columns(2)
     
     with c1:
-        if sommeil_color == "success":
+        if n < EFFECTIF_MIN_CORRELATION:
+            info_effectif()
+        elif sommeil_color == "success":
             st.success(f"**Sommeil ({sommeil_status})** : {sommeil_desc}")
         else:
             st.warning(f"**Sommeil ({sommeil_status})** : {sommeil_desc}")
             
         st.info(f"**Sport** : La fréquence '{meilleur_sport_label}' génère le pic d'énergie maximal.")
 
-    with c2:
-        if stress_color == "error":
-            st.error(f"**Stress ({stress_status})** : {stress_desc}")
-        else:
-            st.success(f"**Stress ({stress_status})** : {stress_desc}")
-        
-        # Hydratation (Logique dynamique simplifiée)
-        hydro_msg = "Lien eau/énergie confirmé." if p_eau_energie < 0.05 else "Pas de lien eau/énergie clair."
-        st.write(f"**Hydratation** : {hydro_msg} (r={r_eau_energie:.2f})")
+    # Sans corrélation estimable, ni stress, ni hydratation, ni intervalles.
+    if n >= EFFECTIF_MIN_CORRELATION:
+        with c2:
+            if stress_color == "error":
+                st.error(f"**Stress ({stress_status})** : {stress_desc}")
+            else:
+                st.success(f"**Stress ({stress_status})** : {stress_desc}")
+
+            st.write(f"**Hydratation** : {conclusions['hydratation']}")
+
+        st.caption(
+            f"Un lien est retenu si p < 0.05 et si son intervalle de confiance à 95 % "
+            f"({TIRAGES} rééchantillons bootstrap) exclut 0."
+        )
 
     st.divider()
 
     # --- RECOMMANDATIONS SUR MESURE ---
     st.markdown("### 3. Recommandations basées sur les données")
     
-    recos = []
-    if sommeil_moy < 6.5:
-        recos.append(f"**Priorité Sommeil** : La moyenne de {sommeil_moy}h est trop basse. Augmenter de 30min/nuit pour stabiliser l'énergie.")
-    if r_stress_eff < -0.20:
-        recos.append("**Gestion du Stress** : L'impact sur l'efficacité est visible. Introduire des micro-pauses actives.")
-    if n < 100:
-        recos.append(f"**Fiabilité** : Collecter {100 - n} réponses supplémentaires pour valider les tendances (actuellement n={n}).")
-
-    for r in recos:
+    for r in conclusions["recos"]:
         st.markdown(r)
 
-    footer()
\ No newline at end of file
+    footer()
+
+spans = end_rerun(page=section)
+
+# Panneau de diagnostic, visible seulement avec ?debug=1 dans l'URL.
+if st.query_params.get("debug") == "1":
+    with st.sidebar:
+        with st.expander("Instrumentation", expanded=True):
+            spans_table(spans)
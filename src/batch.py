@@ -0,0 +1,183 @@
+"""Génère le rapport statique (HTML + PNG) du dashboard pour plusieurs jeux de données.
+
+Chaque source (fichier CSV ou URL d'export) est traitée dans un processus
+séparé, sans runtime Streamlit :
+
+    python -m src.batch cohorte_a.csv cohorte_b.csv https://... -o rapports/ [--workers 4]
+"""
+import argparse
+import hashlib
+import html
+import io
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+
+from src.data_loader import fetch, normalize_columns
+from src.figure_cache import render_png
+from src.metrics import registry
+from src.prerender import PAGE_FIGURES
+from src.preprocessing import clean_rows, finalize
+
+SECTIONS = {
+    "vue":        "Vue générale",
+    "sommeil":    "Sommeil & Productivité",
+    "sport":      "Sport & Energie",
+    "definition": "Définition & Productivité",
+    "pairplot":   "Analyse multivariée",
+    "corr":       "Corrélations",
+}
+
+STYLE = """
+body { font-family: sans-serif; color: #333; max-width: 1100px; margin: 2rem auto; padding: 0 1rem; }
+h1 { color: #fff; background: #A41E37; padding: 1.5rem 2rem; border-radius: 12px; }
+h2 { color: #A41E37; border-bottom: 2px solid #A41E37; padding-bottom: 0.3rem; }
+.kpis { display: flex; gap: 1rem; }
+.kpi { flex: 1; border-top: 4px solid #A41E37; box-shadow: 0 2px 8px rgba(164,30,55,0.10);
+       border-radius: 10px; padding: 0.8rem 1rem; }
+.kpi b { display: block; font-size: 1.5rem; color: #A41E37; }
+img { max-width: 100%; }
+table { border-collapse: collapse; }
+td, th { padding: 0.3rem 0.8rem; border-bottom: 1px solid #eee; text-align: left; }
+"""
+
+_GRAS = re.compile(r"\*\*(.+?)\*\*")
+
+
+def _init_worker() -> None:
+    matplotlib.use("Agg", force=True)
+
+
+def _nom(source: str) -> str:
+    if source.startswith(("http://", "https://")):
+        return "export-" + hashlib.sha1(source.encode()).hexdigest()[:8]
+    return Path(source).stem
+
+
+def _texte(markdown: str) -> str:
+    return _GRAS.sub(r"<strong>\1</strong>", html.escape(markdown))
+
+
+def _html(source: str, profil: pd.DataFrame, m, figures: dict[str, list[str]]) -> str:
+    n = m["n"]
+    conclusions = m["conclusions"]
+    moyennes = profil["moyenne"]
+    kpis = [
+        ("Sommeil moyen",   f"{moyennes['Sommeil_moyen']:.1f}h"),
+        ("Stress moyen",    f"{moyennes['Stress']:.1f} / 5"),
+        ("Energie moyenne", f"{moyennes['Energie']:.1f} / 5"),
+        ("Productivite 7j", f"{moyennes['Productivite_7j']:.1f} / 5"),
+        ("Repondants",      str(n)),
+    ]
+    parties = [
+        "<h1>Santé, Habitudes de vie & Productivité</h1>",
+        f"<p>Source : {html.escape(source)} · n={n} répondants · "
+        f"majorité {html.escape(str(m['age_predominant']))} "
+        f"({html.escape(str(m['situation_top']))} : {m['situation_pct']}%)</p>",
+        "<div class='kpis'>"
+        + "".join(f"<div class='kpi'>{html.escape(k)}<b>{v}</b></div>" for k, v in kpis)
+        + "</div>",
+    ]
+    for section, fichiers in figures.items():
+        parties.append(f"<h2>{html.escape(SECTIONS[section])}</h2>")
+        parties += [f"<img src='{f}' alt='{f}'>" for f in fichiers]
+
+    parties.append("<h2>Rapport statistique</h2>")
+    parties.append(m["rapport"].to_html(float_format="{:.2f}".format))
+
+    sommeil_status, _, sommeil_desc = conclusions["sommeil"]
+    stress_status,  _, stress_desc  = conclusions["stress"]
+    parties += [
+        "<h2>Conclusions & Recommandations</h2>",
+        "<ul>",
+        f"<li>Potentiel de récupération : {8 - m['sommeil_moy']:.1f}h (dette de sommeil)</li>",
+        f"<li>Efficacité moyenne : {m['prod_moy']}/5</li>",
+        f"<li>Meilleur levier : {html.escape(str(m['meilleur_sport_label']))}</li>",
+        f"<li><strong>Sommeil ({sommeil_status})</strong> : {html.escape(sommeil_desc)}</li>",
+        f"<li><strong>Stress ({stress_status})</strong> : {html.escape(stress_desc)}</li>",
+        f"<li><strong>Hydratation</strong> : {html.escape(conclusions['hydratation'])}</li>",
+        "</ul>",
+    ]
+    if conclusions["recos"]:
+        parties.append("<ul>" + "".join(f"<li>{_texte(r)}</li>" for r in conclusions["recos"]) + "</ul>")
+
+    return (
+        "<!DOCTYPE html><html lang='fr'><head><meta charset='utf-8'>"
+        f"<title>PyFusion — {html.escape(source)}</title><style>{STYLE}</style></head>"
+        "<body>" + "\n".join(parties) + "</body></html>"
+    )
+
+
+def generate_report(source: str, dossier: Path) -> Path:
+    # Même pipeline que le dashboard ; preprocess est appelé sans son cache
+    # Streamlit (clean_rows + finalize), inutile dans un processus éphémère.
+    reponse = fetch(source)
+    df_raw = normalize_columns(pd.read_csv(io.BytesIO(reponse.contenu)))
+    df, corr, p_values, profil = finalize(clean_rows(df_raw))
+    donnees = {"df": df, "corr": corr, "p_values": p_values, "profil": profil}
+    m = registry.bind(reponse.empreinte, selection={}, **donnees)
+
+    dossier.mkdir(parents=True, exist_ok=True)
+    figures = {}
+    for section, entrees in PAGE_FIGURES.items():
+        figures[section] = []
+        for fn, noms in entrees:
+            fichier = f"{fn.__name__}.png"
+            (dossier / fichier).write_bytes(render_png(fn(*(donnees[nom] for nom in noms))))
+            figures[section].append(fichier)
+
+    index = dossier / "index.html"
+    index.write_text(_html(source, profil, m, figures), encoding="utf-8")
+    return index
+
+
+def generate_reports(sources: list[str], sortie: Path, workers: int | None = None) -> dict[str, Path | str]:
+    # Source -> chemin du rapport, ou message d'erreur si la source a échoué.
+    noms: dict[str, str] = {}
+    for source in sources:
+        nom = _nom(source)
+        while nom in noms.values():
+            nom += "-" + hashlib.sha1(source.encode()).hexdigest()[:4]
+        noms[source] = nom
+
+    resultats: dict[str, Path | str] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(generate_report, source, sortie / nom): source
+            for source, nom in noms.items()
+        }
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                resultats[source] = future.result()
+            except Exception as e:
+                resultats[source] = f"{type(e).__name__}: {e}"
+    return resultats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="fichiers CSV ou URLs d'export")
+    parser.add_argument("-o", "--sortie", type=Path, default=Path("rapports"))
+    parser.add_argument("--workers", type=int, default=None, help="processus en parallèle (défaut : un par cœur)")
+    args = parser.parse_args()
+
+    resultats = generate_reports(args.sources, args.sortie, args.workers)
+    echecs = 0
+    for source in args.sources:
+        res = resultats[source]
+        if isinstance(res, Path):
+            print(f"{source} -> {res}")
+        else:
+            echecs += 1
+            print(f"ÉCHEC {source} : {res}", file=sys.stderr)
+    if echecs:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.pool import process_pool
+
+# Nombre de rééchantillons par intervalle (PYFUSION_BOOTSTRAP_TIRAGES).
+TIRAGES = int(os.environ.get("PYFUSION_BOOTSTRAP_TIRAGES", "2000"))
+
+# Taille d'un lot, en rééchantillons × lignes : borne la matrice de poids
+# traitée par un seul produit matriciel (et la garde en cache).
+LOT_ELEMENTS = 2**20
+
+# Au moins ce nombre de rééchantillons par lot, même au-delà de LOT_ELEMENTS
+# lignes : sans ce plancher, un export d'un million de lignes tire 2000 lots
+# d'un seul rééchantillon, et le produit matriciel dégénère en produit
+# matrice-vecteur.
+LOT_MIN = 8
+
+# À partir de ce nombre de lignes, les lots sont répartis sur des processus.
+SEUIL_PROCESSUS = 50_000
+BOOTSTRAP_WORKERS = int(os.environ.get("PYFUSION_BOOTSTRAP_WORKERS", "0")) or None
+
+_verrou = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+
+
+def _caracteristiques(x: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    # Colonnes centrées, leurs carrés et les produits des paires demandées :
+    # toutes les sommes d'un rééchantillon sortent d'une ligne de W @ F.
+    x = x - x.mean(axis=0)
+    return np.hstack([x, x * x, x[:, i] * x[:, j]])
+
+
+def _correlations(sommes: np.ndarray, n: int, k: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    moyennes = sommes[:, :k] / n
+    variances = sommes[:, k:2 * k] / n - moyennes**2
+    covariances = sommes[:, 2 * k:] / n - moyennes[:, i] * moyennes[:, j]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return covariances / np.sqrt(variances[:, i] * variances[:, j])
+
+
+def _tirer(x: np.ndarray, i: np.ndarray, j: np.ndarray, lots: list[tuple[np.random.SeedSequence, int]]) -> np.ndarray:
+    # Chaque lot tire b rééchantillons d'un coup : les indices tirés sont
+    # comptés en une matrice de poids (b, n), puis un seul produit donne
+    # les sommes de tous les rééchantillons du lot.
+    n, k = x.shape
+    f = _caracteristiques(x, i, j)
+    resultats = []
+    for graine, b in lots:
+        indices = np.random.default_rng(graine).integers(0, n, size=(b, n))
+        indices += np.arange(b)[:, None] * n
+        poids = np.bincount(indices.ravel(), minlength=b * n).reshape(b, n).astype("float64")
+        resultats.append(_correlations(poids @ f, n, k, i, j))
+    return np.concatenate(resultats)
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    with _verrou:
+        if _pool is None:
+            _pool = process_pool(BOOTSTRAP_WORKERS)
+        return _pool
+
+
+def bootstrap_corr(
+    df: pd.DataFrame,
+    paires,
+    tirages: int = TIRAGES,
+    niveau: float = 0.95,
+    graine: int = 0,
+) -> pd.DataFrame:
+    # Intervalles de confiance par percentiles du r de Pearson de chaque
+    # paire, sur `tirages` rééchantillons avec remise des lignes complètes.
+    # Les graines des lots dérivent de `graine` : le résultat ne dépend ni
+    # du nombre de processus ni de l'ordre d'exécution.
+    paires = [tuple(p) for p in paires]
+    colonnes = list(dict.fromkeys(c for p in paires for c in p))
+    position = {c: k for k, c in enumerate(colonnes)}
+    i = np.array([position[a] for a, _ in paires], dtype="int64")
+    j = np.array([position[b] for _, b in paires], dtype="int64")
+
+    x = df[colonnes].to_numpy(dtype="float64")
+    x = x[~np.isnan(x).any(axis=1)]
+    n = len(x)
+    index = pd.MultiIndex.from_tuples(paires, names=["variable_1", "variable_2"])
+    if n < 3:
+        return pd.DataFrame(np.nan, index=index, columns=["r", "bas", "haut"])
+
+    b = min(tirages, max(LOT_MIN, LOT_ELEMENTS // n))
+    tailles = [b] * (tirages // b) + ([tirages % b] if tirages % b else [])
+    lots = list(zip(np.random.SeedSequence(graine).spawn(len(tailles)), tailles))
+
+    if n >= SEUIL_PROCESSUS and len(lots) > 1:
+        # Une tâche par processus : x n'est transmis qu'une fois à chacun.
+        parts = min(len(lots), BOOTSTRAP_WORKERS or os.cpu_count() or 1)
+        tirages_r = np.concatenate(list(_executor().map(
+            _tirer, *zip(*[(x, i, j, lots[p::parts]) for p in range(parts)]),
+        )))
+    else:
+        tirages_r = _tirer(x, i, j, lots)
+
+    observe = _correlations(_caracteristiques(x, i, j).sum(axis=0)[None, :], n, len(colonnes), i, j)[0]
+    alpha = (1 - niveau) / 2
+    with warnings.catch_warnings():
+        # Paire constante dans tous les rééchantillons : intervalle NaN.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        bas, haut = np.nanquantile(tirages_r, [alpha, 1 - alpha], axis=0)
+    return pd.DataFrame({"r": observe, "bas": bas, "haut": haut}, index=index)
+
+
+def all_pairs(colonnes) -> list[tuple[str, str]]:
+    colonnes = list(colonnes)
+    return [(a, b) for k, a in enumerate(colonnes) for b in colonnes[k + 1:]]
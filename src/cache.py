@@ -0,0 +1,129 @@
+import hashlib
+import io
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from src import correlation, data_loader, moments, preprocessing, sketches, streaming
+from src.correlation import METHODE
+from src.data_loader import LOCAL_CSV, URL, fetch, normalize_columns
+from src.fetcher import Reponse
+from src.instrumentation import span
+from src.preprocessing import preprocess
+from src.streaming import CHUNK_LIGNES, preprocess_stream
+
+CACHE_DIR = Path(__file__).resolve().parents[1] / "data" / "cache"
+CACHE_MAX_ENTREES = 8
+
+# Dernières sorties gardées en mémoire : une feuille inchangée ne relit même
+# pas le Parquet.
+MEMOIRE_MAX_ENTREES = 2
+_en_memoire: OrderedDict[str, tuple] = OrderedDict()
+
+FICHIERS = ("df", "corr", "p_values", "profil")
+
+# Version du format des entrées : à incrémenter quand FICHIERS change.
+FORMAT_CACHE = 2
+
+
+def _version_code() -> str:
+    # Toute modification du chargement ou du nettoyage invalide le cache.
+    h = hashlib.sha256()
+    for module in (data_loader, preprocessing, correlation, moments, sketches, streaming):
+        h.update(Path(module.__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+
+VERSION_CODE = _version_code()
+
+
+def cache_key(empreinte: str) -> str:
+    # `empreinte` : sha256 du CSV brut, déjà calculé par le fetcher.
+    return hashlib.sha256(f"{FORMAT_CACHE}:{VERSION_CODE}:{METHODE}:{empreinte}".encode()).hexdigest()
+
+
+def read_cache(cle: str, dossier: Path = CACHE_DIR) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame] | None:
+    entree = dossier / cle
+    if not entree.is_dir():
+        return None
+    try:
+        frames = tuple(pd.read_parquet(entree / f"{nom}.parquet") for nom in FICHIERS)
+    except (OSError, ValueError):
+        shutil.rmtree(entree, ignore_errors=True)
+        return None
+    entree.touch()
+    return frames
+
+
+def write_cache(cle: str, frames: tuple, dossier: Path = CACHE_DIR) -> None:
+    dossier.mkdir(parents=True, exist_ok=True)
+    tmp = dossier / f".{cle}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    for nom, frame in zip(FICHIERS, frames):
+        frame.to_parquet(tmp / f"{nom}.parquet")
+    try:
+        tmp.rename(dossier / cle)
+    except OSError:
+        # Un autre worker a écrit la même entrée entre-temps.
+        shutil.rmtree(tmp, ignore_errors=True)
+    _purger(dossier)
+
+
+def _purger(dossier: Path) -> None:
+    entrees = sorted(
+        (p for p in dossier.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for entree in entrees[CACHE_MAX_ENTREES:]:
+        shutil.rmtree(entree, ignore_errors=True)
+
+
+def fetch_or_fallback(url: str = URL) -> Reponse:
+    try:
+        return fetch(url)
+    except OSError:
+        return fetch(str(LOCAL_CSV))
+
+
+def load_bytes(
+    contenu: bytes, dossier: Path = CACHE_DIR, empreinte: str | None = None,
+) -> tuple[tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame], str]:
+    # La clé du cache sert aussi de version des données (registre de
+    # métriques, cache de figures) : le frame n'est jamais re-hashé.
+    cle = cache_key(empreinte or hashlib.sha256(contenu).hexdigest())
+    frames = _en_memoire.get(cle)
+    if frames is not None:
+        _en_memoire.move_to_end(cle)
+        return frames, cle
+
+    with span("disk_cache") as s:
+        frames = read_cache(cle, dossier)
+        s.cache = "miss" if frames is None else "hit"
+    if frames is None:
+        if CHUNK_LIGNES:
+            frames = preprocess_stream(contenu, CHUNK_LIGNES)
+        else:
+            with span("read_csv"):
+                df_raw = pd.read_csv(io.BytesIO(contenu))
+            frames = preprocess(normalize_columns(df_raw))
+        with span("write_cache"):
+            write_cache(cle, frames, dossier)
+    _en_memoire[cle] = frames
+    while len(_en_memoire) > MEMOIRE_MAX_ENTREES:
+        _en_memoire.popitem(last=False)
+    return frames, cle
+
+
+def load_url(url: str = URL, dossier: Path = CACHE_DIR) -> tuple[tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame], str]:
+    reponse = fetch_or_fallback(url)
+    return load_bytes(reponse.contenu, dossier, reponse.empreinte)
+
+
+@st.cache_data(ttl=300)
+def load_cached() -> tuple[tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame], str]:
+    return load_url()
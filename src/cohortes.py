@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from src.moments import Moments
+
+# Colonnes proposées comme filtres de cohorte dans la barre latérale.
+FILTRES = ("Age", "Situation", "Frequence_sport", "Definition_productivite")
+
+
+def _coder(serie: pd.Series) -> tuple[np.ndarray, list]:
+    # Codes 0..K-1 par modalité (ordre des catégories, ou valeurs triées) ;
+    # les valeurs manquantes prennent le code K.
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codes, modalites = serie.cat.codes.to_numpy(), list(serie.cat.categories)
+    else:
+        codes, uniques = pd.factorize(serie, sort=True)
+        modalites = uniques.tolist()
+    codes = np.where(codes < 0, len(modalites), codes).astype("int64")
+    return codes, modalites
+
+
+def filter_options(df: pd.DataFrame, filtres=FILTRES) -> dict[str, list]:
+    # Modalités de chaque filtre, dans l'ordre du cube, sans le construire.
+    return {f: _coder(df[f])[1] for f in filtres if f in df}
+
+
+class Cube:
+    # Index des cohortes, construit une fois par version des données :
+    # - un bitmap de lignes (np.packbits) par modalité de chaque filtre, d'où
+    #   le masque d'une sélection par OU / ET bit à bit ;
+    # - un cube des statistiques suffisantes par cellule (combinaison de
+    #   modalités présente dans les données) : effectif, sommes, produits
+    #   croisés (sommes des carrés sur la diagonale), min et max. Les valeurs
+    #   sont décalées de la moyenne globale pour limiter les annulations.
+    # Moyennes, KPIs et corrélations d'une sélection s'obtiennent en sommant
+    # les cellules retenues, sans relire les lignes.
+
+    def __init__(self, df: pd.DataFrame, colonnes, filtres=FILTRES):
+        self.filtres = [f for f in filtres if f in df]
+        self.colonnes = list(colonnes)
+        self.n = len(df)
+
+        self.modalites: dict[str, list] = {}
+        self.bitmaps: dict[str, np.ndarray] = {}
+        codes = []
+        for f in self.filtres:
+            c, modalites = _coder(df[f])
+            self.modalites[f] = modalites
+            self.bitmaps[f] = np.stack([np.packbits(c == k) for k in range(len(modalites) + 1)])
+            codes.append(c)
+
+        # Cellules occupées uniquement : leur nombre est borné par n, même si
+        # une colonne a beaucoup de modalités. Identifiant de cellule en base
+        # mixte (une « chiffre » par filtre), décodé pour les cellules gardées.
+        bases = [len(self.modalites[f]) + 1 for f in self.filtres]
+        identifiant = np.zeros(self.n, dtype="int64")
+        for c, base in zip(codes, bases):
+            identifiant = identifiant * base + c
+        ids, cellule = np.unique(identifiant, return_inverse=True)
+        self.codes = {}
+        for f, base in zip(reversed(self.filtres), reversed(bases)):
+            ids, self.codes[f] = np.divmod(ids, base)
+        c = len(cellule) and int(cellule.max()) + 1
+
+        x = df[self.colonnes].to_numpy(dtype="float64")
+        self.decalage = np.nanmean(x, axis=0) if len(x) else np.zeros(len(self.colonnes))
+        x = x - self.decalage
+        k = len(self.colonnes)
+        self.effectifs = np.bincount(cellule, minlength=c).astype("float64")
+        self.sommes = np.empty((c, k))
+        self.produits = np.empty((c, k, k))
+        for i in range(k):
+            self.sommes[:, i] = np.bincount(cellule, weights=x[:, i], minlength=c)
+            for j in range(i, k):
+                p = np.bincount(cellule, weights=x[:, i] * x[:, j], minlength=c)
+                self.produits[:, i, j] = self.produits[:, j, i] = p
+        groupes = pd.DataFrame(x + self.decalage, columns=self.colonnes).groupby(cellule)
+        self.min = groupes.min().to_numpy()
+        self.max = groupes.max().to_numpy()
+
+    def _cellules(self, selection: dict) -> np.ndarray:
+        retenues = np.ones(len(self.effectifs), dtype=bool)
+        for f, valeurs in selection.items():
+            if valeurs:
+                indices = [self.modalites[f].index(v) for v in valeurs]
+                retenues &= np.isin(self.codes[f], indices)
+        return retenues
+
+    def mask(self, selection: dict) -> np.ndarray:
+        # Lignes de la sélection : OU des modalités choisies dans un filtre, ET
+        # entre les filtres.
+        bits = np.full((self.n + 7) // 8, 0xFF, dtype=np.uint8)
+        for f, valeurs in selection.items():
+            if valeurs:
+                indices = [self.modalites[f].index(v) for v in valeurs]
+                bits &= np.bitwise_or.reduce(self.bitmaps[f][indices], axis=0)
+        return np.unpackbits(bits, count=self.n).astype(bool)
+
+    def moments(self, selection: dict) -> Moments:
+        retenues = self._cellules(selection)
+        moments = Moments(self.colonnes)
+        n = self.effectifs[retenues].sum()
+        if n == 0:
+            return moments
+        sommes = self.sommes[retenues].sum(axis=0)
+        moments.n        = int(n)
+        moments.mean     = self.decalage + sommes / n
+        moments.comoment = self.produits[retenues].sum(axis=0) - np.outer(sommes, sommes) / n
+        moments.min      = self.min[retenues].min(axis=0)
+        moments.max      = self.max[retenues].max(axis=0)
+        return moments
+
+    def means(self, selection: dict, filtre: str) -> pd.DataFrame:
+        # Moyennes par modalité de `filtre` dans la sélection (équivalent d'un
+        # groupby(filtre).mean()), modalités absentes exclues.
+        retenues = self._cellules(selection)
+        k = len(self.modalites[filtre])
+        codes = self.codes[filtre][retenues]
+        effectifs = np.bincount(codes, weights=self.effectifs[retenues], minlength=k + 1)[:k]
+        sommes = np.zeros((k + 1, len(self.colonnes)))
+        np.add.at(sommes, codes, self.sommes[retenues])
+        presents = effectifs > 0
+        index = pd.Index([v for v, p in zip(self.modalites[filtre], presents) if p], name=filtre)
+        moyennes = self.decalage + sommes[:k][presents] / effectifs[presents, None]
+        return pd.DataFrame(moyennes, index=index, columns=self.colonnes)
+
+    def profile(self, selection: dict, moments: Moments | None = None) -> pd.DataFrame:
+        # Même schéma que le profil de preprocess, réduit à ce que donnent les
+        # cellules : effectif, moyenne, min, max des colonnes numériques,
+        # modalité dominante et sa part pour les filtres catégoriels.
+        retenues = self._cellules(selection)
+        moments = moments or self.moments(selection)
+        lignes = {
+            col: {"n": moments.n, "moyenne": moy, "min": bas, "max": haut}
+            for col, moy, bas, haut in zip(self.colonnes, moments.means(), moments.min, moments.max)
+        }
+        for f in self.filtres:
+            if f in lignes:
+                continue
+            k = len(self.modalites[f])
+            effectifs = np.bincount(self.codes[f][retenues], weights=self.effectifs[retenues], minlength=k + 1)
+            presents = effectifs[:k].sum()
+            lignes[f] = {
+                "n":         moments.n,
+                "nuls":      int(effectifs[k]),
+                "modalite":  self.modalites[f][int(np.argmax(effectifs[:k]))] if presents else None,
+                "part_mode": effectifs[:k].max() / presents if presents else np.nan,
+            }
+        return pd.DataFrame.from_dict(lignes, orient="index")
@@ -4,13 +4,14 @@ import pandas as pd
 ESIH_RED = "#A41E37"
 
 
-def kpi_row(df: pd.DataFrame) -> None:
+def kpi_row(profil: pd.DataFrame, n: int) -> None:
+    moyennes = profil["moyenne"]
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("Sommeil moyen",   f"{df['Sommeil_moyen'].mean():.1f}h")
-    col2.metric("Stress moyen",    f"{df['Stress'].mean():.1f} / 5")
-    col3.metric("Energie moyenne", f"{df['Energie'].mean():.1f} / 5")
-    col4.metric("Productivite 7j", f"{df['Productivite_7j'].mean():.1f} / 5")
-    col5.metric("Repondants",      str(len(df)))
+    col1.metric("Sommeil moyen",   f"{moyennes['Sommeil_moyen']:.1f}h")
+    col2.metric("Stress moyen",    f"{moyennes['Stress']:.1f} / 5")
+    col3.metric("Energie moyenne", f"{moyennes['Energie']:.1f} / 5")
+    col4.metric("Productivite 7j", f"{moyennes['Productivite_7j']:.1f} / 5")
+    col5.metric("Repondants",      str(n))
 
 
 def section_header(title: str, description: str = "") -> None:
@@ -31,5 +32,28 @@ def rapport_table(rapport_df: pd.DataFrame) -> None:
         rapport_df.style
         .format({"Moyenne": "{:.2f}"})
         .background_gradient(cmap="Reds", subset=["Moyenne"]),
-        use_container_width=True,
-    )
\ No newline at end of file
+        width="stretch",
+    )
+
+
+def spans_table(spans) -> None:
+    if not spans:
+        st.caption("Aucune étape mesurée pour ce rerun.")
+        return
+    lignes = [
+        {
+            "étape":   "  " * s.profondeur + s.nom,
+            "mur_ms":  s.mur * 1000,
+            "cpu_ms":  s.cpu * 1000,
+            "pic_Mo":  s.pic_octets / 2**20 if s.pic_octets is not None else None,
+            "cache":   s.cache or "",
+        }
+        for s in spans
+    ]
+    st.dataframe(
+        pd.DataFrame(lignes).style.format(
+            {"mur_ms": "{:.1f}", "cpu_ms": "{:.1f}", "pic_Mo": "{:.1f}"}, na_rep="—",
+        ),
+        hide_index=True,
+        width="stretch",
+    )
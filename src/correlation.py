@@ -0,0 +1,276 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+
+# Coefficient de la matrice de corrélation produite par preprocess
+# (PYFUSION_CORRELATION) : pearson, spearman ou kendall (tau-b).
+METHODES = ("pearson", "spearman", "kendall")
+METHODE = os.environ.get("PYFUSION_CORRELATION", "pearson")
+
+# Tau de Kendall : au plus KENDALL_TABLE_MAX cases, une paire est comptée sur
+# sa table de contingence ; au-delà, par tri, KENDALL_LOT_ELEMENTS valeurs
+# (paires × lignes) à la fois.
+KENDALL_TABLE_MAX = 2**16
+KENDALL_LOT_ELEMENTS = 2**22
+
+# Nombre maximal de permutations par paire (PYFUSION_PERMUTATIONS).
+PERMUTATIONS = int(os.environ.get("PYFUSION_PERMUTATIONS", "2000"))
+
+# Taille d'un lot de permutations : au plus PERMUTATIONS_LOT tours, et au plus
+# PERMUTATIONS_LOT_ELEMENTS valeurs (tours × lignes × colonnes) en mémoire.
+PERMUTATIONS_LOT = 500
+PERMUTATIONS_LOT_ELEMENTS = 2**22
+
+# Risque d'erreur de l'arrêt anticipé (intervalle de Clopper-Pearson sur p).
+RISQUE_ARRET = 1e-3
+
+
+def pairwise_counts(df: pd.DataFrame) -> pd.DataFrame:
+    # Nombre d'observations communes à chaque paire (comme DataFrame.corr).
+    presents = df.notna().to_numpy(dtype="float64")
+    return pd.DataFrame(presents.T @ presents, index=df.columns, columns=df.columns)
+
+
+def pearson_pvalues(corr: pd.DataFrame, n) -> pd.DataFrame:
+    # Test bilatéral H0 : r = 0, t = r * sqrt((n - 2) / (1 - r²)) à n - 2 ddl,
+    # calculé pour toute la matrice d'un coup. `n` est un entier ou une matrice
+    # d'effectifs par paire (cf. pairwise_counts).
+    r = corr.to_numpy(dtype="float64")
+    ddl = np.asarray(n, dtype="float64") - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.clip(r * r, 0.0, 1.0)
+        t2 = r2 * ddl / (1.0 - r2)
+        # P(|T| > |t|) = I_{ddl / (ddl + t²)}(ddl / 2, 1 / 2)
+        p = special.betainc(ddl / 2, 0.5, ddl / (ddl + t2))
+    p = np.where(r2 == 1.0, 0.0, p)
+    p = np.where(ddl > 0, p, np.nan)
+    p = np.where(np.isnan(r), np.nan, p)
+    return pd.DataFrame(p, index=corr.index, columns=corr.columns)
+
+
+def _bornes(depassements: np.ndarray, tirages: np.ndarray, risque: float) -> tuple[np.ndarray, np.ndarray]:
+    # Intervalle de Clopper-Pearson de la proportion de dépassements.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bas = np.where(depassements > 0, special.betaincinv(depassements, tirages - depassements + 1, risque / 2), 0.0)
+        haut = np.where(
+            depassements < tirages,
+            special.betaincinv(depassements + 1, tirages - depassements, 1 - risque / 2),
+            1.0,
+        )
+    return bas, haut
+
+
+def permutation_pvalues(
+    df: pd.DataFrame,
+    permutations: int = PERMUTATIONS,
+    alpha: float = 0.05,
+    graine: int = 0,
+) -> pd.DataFrame:
+    # Test de permutation bilatéral de H0 : r = 0, pour toutes les paires à
+    # la fois et sans hypothèse de normalité (échelles de Likert bornées).
+    # Chaque tour permute les lignes une fois : z.T @ z[π] donne en un
+    # produit la corrélation de chaque variable avec chaque autre permutée ;
+    # (i, j) et (j, i) sont deux tirages sous H0, comptés pour moitié.
+    # Les tours sont traités par lots ; après chaque lot, une paire dont p
+    # est nettement sous ou au-dessus d'alpha est figée, et seules les
+    # colonnes des paires encore indécises restent dans le produit.
+    # p = (1 + dépassements) / (1 + tours). Les lignes incomplètes sont
+    # ignorées ; même graine et mêmes données donnent le même résultat.
+    colonnes = list(df.columns)
+    x = df.to_numpy(dtype="float64")
+    x = x[~np.isnan(x).any(axis=1)]
+    n, k = x.shape
+    p = np.full((k, k), np.nan)
+    if n < 3:
+        return pd.DataFrame(p, index=colonnes, columns=colonnes)
+
+    ecarts = x.std(axis=0)
+    variables = ecarts > 0
+    z = (x - x.mean(axis=0)) / np.where(variables, ecarts, 1.0) / np.sqrt(n)
+    observe = np.abs(z.T @ z) - 1e-12
+    zt = np.ascontiguousarray(z.T)
+
+    depassements = np.zeros((k, k))
+    tirages = np.zeros((k, k))
+    actives = np.outer(variables, variables)
+    np.fill_diagonal(actives, False)
+    rng = np.random.default_rng(graine)
+    lot = max(1, min(PERMUTATIONS_LOT, PERMUTATIONS_LOT_ELEMENTS // (n * k)))
+    faits = 0
+    while faits < permutations and actives.any():
+        b = min(lot, permutations - faits)
+        ordres = rng.permuted(np.tile(np.arange(n, dtype="int32"), (b, 1)), axis=1)
+        cols = np.flatnonzero(actives.any(axis=0))
+        sous = np.ix_(cols, cols)
+        zc = zt[cols]
+        # permutes[j, t] = colonne j permutée au tour t ; un seul produit
+        # donne r[j, t, i] pour tous les tours du lot.
+        permutes = np.take(zc, ordres, axis=1)
+        r = np.abs(permutes.reshape(-1, n) @ zc.T).reshape(len(cols), b, len(cols))
+        e = (r >= observe[sous].T[:, None, :]).sum(axis=1)
+        e = (e + e.T) / 2
+        a = actives[sous]
+        depassements[sous] += np.where(a, e, 0)
+        tirages[sous] += np.where(a, b, 0)
+        faits += b
+        bas, haut = _bornes(depassements[sous], tirages[sous], RISQUE_ARRET)
+        actives[sous] = a & ~((haut < alpha) | (bas > alpha))
+
+    paires = np.outer(variables, variables)
+    p = np.where(paires, (1 + depassements) / (1 + tirages), np.nan)
+    np.fill_diagonal(p, np.where(variables, 0.0, np.nan))
+    return pd.DataFrame(p, index=colonnes, columns=colonnes)
+
+
+def _matrice(r: np.ndarray, variables: np.ndarray, colonnes) -> pd.DataFrame:
+    # Même convention que Moments.corr : diagonale à 1, NaN pour une colonne
+    # constante.
+    r = np.clip(r, -1.0, 1.0)
+    r = np.where(np.outer(variables, variables), r, np.nan)
+    np.fill_diagonal(r, np.where(variables, 1.0, np.nan))
+    return pd.DataFrame(r, index=colonnes, columns=colonnes)
+
+
+def spearman(x: np.ndarray, colonnes) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Rangs moyens calculés une fois par colonne, puis Pearson sur les rangs
+    # en un seul produit matriciel ; p-values par la même approximation t.
+    z = stats.rankdata(x, axis=0)
+    z = z - z.mean(axis=0)
+    ecarts = np.sqrt((z * z).sum(axis=0))
+    variables = ecarts > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho = _matrice((z.T @ z) / np.outer(ecarts, ecarts), variables, colonnes)
+    return rho, pearson_pvalues(rho, len(x))
+
+
+def _paires_egales(effectifs: np.ndarray) -> tuple[float, float, float]:
+    # Pour des groupes d'ex aequo de tailles t : Σ t(t-1)/2, Σ t(t-1)(t-2),
+    # Σ t(t-1)(2t+5) (termes de tau-b et de sa variance).
+    t = effectifs[effectifs > 1].astype("float64")
+    return (t * (t - 1) / 2).sum(), (t * (t - 1) * (t - 2)).sum(), (t * (t - 1) * (2 * t + 5)).sum()
+
+
+def _inversions(y: np.ndarray) -> np.ndarray:
+    # Nombre de paires i < j avec y[i] > y[j], pour chaque ligne de y (codes
+    # entiers ≥ 0). Tri par base 2 stable, du bit de poids fort au plus
+    # faible : dans chaque groupe de même préfixe, un 0 précédé de uns forme
+    # autant d'inversions, puis le groupe est scindé (zéros puis uns, ordre
+    # conservé) pour le bit suivant. Chaque niveau est une passe vectorisée
+    # sur toutes les lignes : O(n log m) pour m codes distincts.
+    lignes, n = y.shape
+    inversions = np.zeros(lignes, dtype="int64")
+    if n < 2:
+        return inversions
+    rang = np.arange(n)
+    for b in range(int(y.max()).bit_length() - 1, -1, -1):
+        bit = (y >> b) & 1
+        prefixe = y >> (b + 1)
+        nouveau = np.ones_like(bit, dtype=bool)
+        nouveau[:, 1:] = prefixe[:, 1:] != prefixe[:, :-1]
+        dernier = np.ones_like(nouveau)
+        dernier[:, :-1] = nouveau[:, 1:]
+        debut = np.maximum.accumulate(np.where(nouveau, rang, 0), axis=1)
+        fin = np.minimum.accumulate(np.where(dernier, rang, n)[:, ::-1], axis=1)[:, ::-1]
+
+        uns = np.cumsum(bit, axis=1)
+        uns_debut = np.take_along_axis(uns - bit, debut, axis=1)
+        uns_avant = uns - bit - uns_debut
+        inversions += np.where(bit == 0, uns_avant, 0).sum(axis=1)
+
+        zeros_groupe = fin - debut + 1 - (np.take_along_axis(uns, fin, axis=1) - uns_debut)
+        position = np.where(bit == 0, debut + (rang - debut) - uns_avant, debut + zeros_groupe + uns_avant)
+        scinde = np.empty_like(y)
+        np.put_along_axis(scinde, position, y, axis=1)
+        y = scinde
+    return inversions
+
+
+def _discordances_table(cx: np.ndarray, cy: np.ndarray, a: int, b: int) -> tuple[int, int]:
+    # Paires discordantes et paires ex aequo sur (x, y) depuis la table de
+    # contingence : une case (i, j) est discordante avec toutes les cases
+    # (i' > i, j' < j), sommées par cumuls. O(n + a·b), exact avec ex aequo.
+    table = np.bincount(cx * b + cy, minlength=a * b).reshape(a, b)
+    apres = table[::-1].cumsum(axis=0)[::-1][1:]
+    discordantes = np.zeros_like(table)
+    discordantes[:-1, 1:] = apres.cumsum(axis=1)[:, :-1]
+    return int((table * discordantes).sum()), int((table * (table - 1) // 2).sum())
+
+
+def kendall(x: np.ndarray, colonnes) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Tau-b de Kendall de toutes les paires (algorithme de Knight) : paires
+    # discordantes et ex aequo joints, corrigés par les ex aequo de chaque
+    # colonne. Codes peu nombreux (échelles de Likert) : table de contingence.
+    # Sinon, lignes triées par (x, y) et discordances comptées comme
+    # inversions de y, les paires d'un lot toutes à la fois.
+    # p-values par l'approximation normale avec ex aequo (comme scipy).
+    n, k = x.shape
+    codes = np.empty((n, k), dtype="int64")
+    egalites = []
+    for j in range(k):
+        _, codes[:, j], effectifs = np.unique(x[:, j], return_inverse=True, return_counts=True)
+        egalites.append(_paires_egales(effectifs))
+    modalites = codes.max(axis=0) + 1 if n else np.zeros(k, dtype="int64")
+
+    paires = [(i, j) for i in range(k) for j in range(i + 1, k)]
+    discordantes, communes = {}, {}
+    triees = []
+    for i, j in paires:
+        if modalites[i] * modalites[j] <= KENDALL_TABLE_MAX:
+            discordantes[i, j], communes[i, j] = _discordances_table(
+                codes[:, i], codes[:, j], modalites[i], modalites[j],
+            )
+        else:
+            triees.append((i, j))
+
+    lot = max(1, KENDALL_LOT_ELEMENTS // max(n, 1))
+    rang = np.arange(n)
+    for debut in range(0, len(triees), lot):
+        i, j = (np.array(c) for c in zip(*triees[debut:debut + lot]))
+        cle = codes[:, i].T * modalites[j][:, None] + codes[:, j].T
+        ordre = np.argsort(cle, axis=1)
+        cle = np.take_along_axis(cle, ordre, axis=1)
+        y = np.take_along_axis(codes[:, j].T, ordre, axis=1)
+        # Ex aequo sur (x, y) : Σ v(v-1)/2 = Σ des rangs dans chaque série.
+        nouveau = np.ones_like(cle, dtype=bool)
+        nouveau[:, 1:] = cle[:, 1:] != cle[:, :-1]
+        debuts = np.maximum.accumulate(np.where(nouveau, rang, 0), axis=1)
+        for paire, d, c in zip(zip(i, j), _inversions(y), (rang - debuts).sum(axis=1)):
+            discordantes[paire], communes[paire] = int(d), int(c)
+
+    tau = np.full((k, k), np.nan)
+    p = np.full((k, k), np.nan)
+    total = n * (n - 1) / 2
+    if paires:
+        i, j = (np.array(c) for c in zip(*paires))
+        ex, e0, e1 = (np.array([egalites[c][t] for c in i]) for t in range(3))
+        ey, f0, f1 = (np.array([egalites[c][t] for c in j]) for t in range(3))
+        difference = (
+            total - ex - ey + np.array([communes[q] for q in paires])
+            - 2 * np.array([discordantes[q] for q in paires])
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = difference / np.sqrt(total - ex) / np.sqrt(total - ey)
+            m = n * (n - 1.0)
+            variance = (m * (2 * n + 5) - e1 - f1) / 18 + 2 * ex * ey / m + e0 * f0 / (9 * m * (n - 2))
+            pv = special.erfc(np.abs(difference) / np.sqrt(variance) / np.sqrt(2))
+        tau[i, j] = tau[j, i] = t
+        p[i, j] = p[j, i] = np.where(np.isnan(t), np.nan, pv)
+
+    variables = np.array([total - e[0] > 0 for e in egalites], dtype=bool)
+    p = np.where(np.outer(variables, variables), p, np.nan)
+    np.fill_diagonal(p, np.where(variables, 0.0, np.nan))
+    return _matrice(tau, variables, colonnes), pd.DataFrame(p, index=colonnes, columns=colonnes)
+
+
+def rank_correlation(df: pd.DataFrame, method: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Matrice de corrélation de rangs et ses p-values, sur les lignes
+    # complètes (les données sont déjà imputées en sortie de preprocess).
+    x = df.to_numpy(dtype="float64")
+    x = x[~np.isnan(x).any(axis=1)]
+    if method == "spearman":
+        return spearman(x, list(df.columns))
+    if method == "kendall":
+        return kendall(x, list(df.columns))
+    raise ValueError(f"Méthode de corrélation inconnue : {method}")
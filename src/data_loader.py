@@ -1,8 +1,20 @@
+import functools
+import io
+import re
+import unicodedata
+import warnings
+from pathlib import Path
+
 import pandas as pd
 import streamlit as st
 
+from src.fetcher import Reponse, fetcher
+from src.instrumentation import span
+
 URL = "https://docs.google.com/spreadsheets/d/1YwuNz9lKEx8zj3th5hHfI1Z7i2WKUGexfqPnrxn6jiw/export?format=csv"
 
+LOCAL_CSV = Path(__file__).resolve().parents[1] / "data" / "data.csv"
+
 RENAME_MAP = {
     "Horodateur": "Timestamp",
     "Pour vous, être productif, c'est avant tout...": "Definition_productivite",
@@ -22,46 +34,86 @@ RENAME_MAP = {
 }
 
 
+# Table de traduction construite une fois à l'import : apostrophes typographiques
+# et accents ramenés en ASCII en un seul passage.
+_TRADUCTION = str.maketrans({
+    "\u2019": "'", "\u2018": "'",
+    "é": "e", "è": "e", "ê": "e",
+    "à": "a", "â": "a",
+    "î": "i", "ô": "o", "û": "u", "ç": "c",
+})
+
+_ESPACES = re.compile(r"\s+")
+
+# URL -> (empreinte du corps, export lu et renommé).
+_lectures: dict[str, tuple[str, pd.DataFrame]] = {}
+
+
 @st.cache_data(ttl=300)
 def load_data() -> pd.DataFrame:
-    df = pd.read_csv(URL)
-
-    df.columns = (
-        df.columns
-        .str.strip()
-        .str.replace(r"\s+", " ", regex=True)
-        .str.replace("\u2019", "'", regex=False)
-        .str.replace("\u2018", "'", regex=False)
-        .str.replace("\u00e9", "e", regex=False)
-        .str.replace("é", "e", regex=False)
-        .str.lower()
-    )
-
-    rename_lower = {k.lower()
-                    .replace("\u2019", "'")
-                    .replace("\u2018", "'")
-                    .replace("é", "e")
-                    .replace("è", "e")
-                    .replace("ê", "e")
-                    .replace("à", "a")
-                    .replace("â", "a")
-                    .replace("î", "i")
-                    .replace("ô", "o")
-                    .replace("û", "u")
-                    .replace("ç", "c")
-                    : v for k, v in RENAME_MAP.items()}
-
-    df.columns = (
-        df.columns
-        .str.replace("è", "e", regex=False)
-        .str.replace("ê", "e", regex=False)
-        .str.replace("à", "a", regex=False)
-        .str.replace("â", "a", regex=False)
-        .str.replace("î", "i", regex=False)
-        .str.replace("ô", "o", regex=False)
-        .str.replace("û", "u", regex=False)
-        .str.replace("ç", "c", regex=False)
-    )
-
-    df = df.rename(columns=rename_lower)
-    return df
\ No newline at end of file
+    return read_export(URL)
+
+
+def read_export(url: str = URL) -> pd.DataFrame:
+    # Une feuille inchangée depuis la dernière lecture (304 ou même empreinte)
+    # n'est pas reparsée.
+    reponse = fetch(url)
+    precedente = _lectures.get(url)
+    if precedente is not None and precedente[0] == reponse.empreinte:
+        return precedente[1]
+    with span("read_csv"):
+        df = pd.read_csv(io.BytesIO(reponse.contenu))
+    df = normalize_columns(df)
+    _lectures[url] = (reponse.empreinte, df)
+    return df
+
+
+def fetch(url: str = URL) -> Reponse:
+    with span("fetch") as s:
+        reponse = fetcher.fetch(url)
+        s.cache = "miss" if reponse.modifie else "hit"
+    return reponse
+
+
+def fetch_bytes(url: str = URL) -> bytes:
+    return fetch(url).contenu
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    with span("normalize_columns") as s:
+        hits = _plan_renommage.cache_info().hits
+        noms, non_reconnus, manquants = _plan_renommage(tuple(map(str, df.columns)))
+        s.cache = "hit" if _plan_renommage.cache_info().hits > hits else "miss"
+    if manquants:
+        raise ValueError(
+            f"Colonnes attendues absentes de l'export : {', '.join(manquants)}. "
+            f"En-têtes non reconnus : {', '.join(non_reconnus) or 'aucun'}."
+        )
+    if non_reconnus:
+        warnings.warn(f"En-têtes non reconnus ignorés : {', '.join(non_reconnus)}", stacklevel=2)
+    df.columns = noms
+    return df
+
+
+def check_headers(columns) -> tuple[list[str], list[str]]:
+    _, non_reconnus, manquants = _plan_renommage(tuple(map(str, columns)))
+    return list(non_reconnus), list(manquants)
+
+
+def _normaliser_entete(nom: str) -> str:
+    nom = unicodedata.normalize("NFC", nom).strip()
+    return _ESPACES.sub(" ", nom).lower().translate(_TRADUCTION)
+
+
+RENAME_NORMALISE = {_normaliser_entete(k): v for k, v in RENAME_MAP.items()}
+
+
+@functools.lru_cache(maxsize=64)
+def _plan_renommage(entetes: tuple[str, ...]) -> tuple[tuple[str, ...], tuple[str, ...], tuple[str, ...]]:
+    # Mémoïsé par signature d'en-têtes : une feuille dont la mise en page ne
+    # change pas ne coûte qu'une recherche dans le cache.
+    normalises = [_normaliser_entete(c) for c in entetes]
+    noms = tuple(RENAME_NORMALISE.get(c, c) for c in normalises)
+    non_reconnus = tuple(brut for brut, c in zip(entetes, normalises) if c not in RENAME_NORMALISE)
+    manquants = tuple(v for v in RENAME_MAP.values() if v not in noms)
+    return noms, non_reconnus, manquants
@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+REDIRECTIONS_MAX = 5
+FETCH_WORKERS = 8
+
+
+@dataclass
+class Reponse:
+    contenu: bytes
+    empreinte: str      # sha256 du corps
+    modifie: bool       # False : 304, ou corps identique au précédent
+
+
+class SheetFetcher:
+    # Téléchargement des exports avec connexions réutilisées (keep-alive, pool
+    # de connexions libres par hôte) et requêtes conditionnelles : ETag /
+    # Last-Modified quand le serveur les fournit, sinon comparaison du sha256
+    # du corps. Le dernier corps de chaque URL est gardé pour répondre aux 304.
+
+    def __init__(self, timeout: float = 10):
+        self.timeout = timeout
+        self._libres: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._etats: dict[str, dict] = {}
+        self._verrou = threading.Lock()
+        self.requetes = 0
+        self.connexions = 0
+        self.non_modifies = 0
+
+    def fetch(self, url: str) -> Reponse:
+        # Fichier local : relu à chaque fois, rien n'est gardé en mémoire.
+        if not url.startswith(("http://", "https://")):
+            corps = Path(url).read_bytes()
+            return Reponse(corps, hashlib.sha256(corps).hexdigest(), True)
+
+        with self._verrou:
+            etat = self._etats.get(url, {})
+        entetes = {"Accept-Encoding": "gzip"}
+        if "contenu" in etat:
+            if etat.get("etag"):
+                entetes["If-None-Match"] = etat["etag"]
+            if etat.get("last_modified"):
+                entetes["If-Modified-Since"] = etat["last_modified"]
+
+        statut, en_tetes, corps = self._requete(url, entetes)
+        if statut == 304 and "contenu" in etat:
+            with self._verrou:
+                self.non_modifies += 1
+            return Reponse(etat["contenu"], etat["empreinte"], False)
+        if statut != 200:
+            raise OSError(f"HTTP {statut} pour {url}")
+        if en_tetes.get("content-encoding") == "gzip":
+            corps = gzip.decompress(corps)
+        return self._enregistrer(url, corps, en_tetes)
+
+    def fetch_many(self, urls, workers: int = FETCH_WORKERS) -> dict[str, Reponse | OSError]:
+        # Une feuille par cohorte, téléchargées en parallèle ; une URL en
+        # échec donne son exception au lieu d'interrompre les autres.
+        def telecharger(url):
+            try:
+                return self.fetch(url)
+            except OSError as e:
+                return e
+
+        with self._verrou:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=workers)
+        urls = list(dict.fromkeys(urls))
+        return dict(zip(urls, self._executor.map(telecharger, urls)))
+
+    def clear(self) -> None:
+        with self._verrou:
+            self._etats.clear()
+
+    def stats(self) -> dict:
+        with self._verrou:
+            return {
+                "requetes": self.requetes,
+                "connexions": self.connexions,
+                "non_modifies": self.non_modifies,
+                "urls": len(self._etats),
+            }
+
+    def _enregistrer(self, url: str, corps: bytes, en_tetes: dict) -> Reponse:
+        empreinte = hashlib.sha256(corps).hexdigest()
+        with self._verrou:
+            precedent = self._etats.get(url, {})
+            modifie = precedent.get("empreinte") != empreinte
+            contenu = corps if modifie else precedent["contenu"]
+            self._etats[url] = {
+                "etag": en_tetes.get("etag"),
+                "last_modified": en_tetes.get("last-modified"),
+                "contenu": contenu,
+                "empreinte": empreinte,
+            }
+        return Reponse(contenu, empreinte, modifie)
+
+    def _requete(self, url: str, entetes: dict) -> tuple[int, dict, bytes]:
+        # L'export Google Sheets redirige vers googleusercontent.com.
+        for _ in range(REDIRECTIONS_MAX + 1):
+            parties = urlsplit(url)
+            chemin = (parties.path or "/") + (f"?{parties.query}" if parties.query else "")
+            statut, en_tetes, corps = self._envoyer(parties.scheme, parties.netloc, chemin, entetes)
+            if statut in (301, 302, 303, 307, 308) and "location" in en_tetes:
+                url = urljoin(url, en_tetes["location"])
+                continue
+            return statut, en_tetes, corps
+        raise OSError(f"Trop de redirections pour {url}")
+
+    def _connexion(self, schema: str, hote: str) -> http.client.HTTPConnection:
+        # Chaque Streamlit rerun tourne dans un nouveau thread : le pool est
+        # partagé, une connexion n'est prêtée qu'à un thread à la fois.
+        with self._verrou:
+            libres = self._libres.get((schema, hote))
+            if libres:
+                return libres.pop()
+        classe = http.client.HTTPSConnection if schema == "https" else http.client.HTTPConnection
+        return classe(hote, timeout=self.timeout)
+
+    def _envoyer(self, schema: str, hote: str, chemin: str, entetes: dict) -> tuple[int, dict, bytes]:
+        connexion = self._connexion(schema, hote)
+        # Une connexion gardée ouverte a pu être fermée par le serveur entre
+        # deux rafraîchissements : un seul nouvel essai, sur une connexion neuve.
+        for essai in range(2):
+            nouvelle = connexion.sock is None
+            try:
+                connexion.request("GET", chemin, headers=entetes)
+                reponse = connexion.getresponse()
+                corps = reponse.read()
+            except (http.client.HTTPException, OSError) as e:
+                connexion.close()
+                if essai or nouvelle:
+                    raise OSError(f"Échec de la requête vers {hote} : {e}") from e
+                continue
+            with self._verrou:
+                self.requetes += 1
+                self.connexions += nouvelle
+                if reponse.will_close:
+                    connexion.close()
+                else:
+                    self._libres.setdefault((schema, hote), []).append(connexion)
+            return reponse.status, {k.lower(): v for k, v in reponse.getheaders()}, corps
+
+
+# Partagé par le chargement, le cache disque et l'ingestion incrémentale.
+fetcher = SheetFetcher()
@@ -0,0 +1,137 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import span
+
+FIGURE_CACHE_MAX_OCTETS = 64 * 1024 * 1024
+
+# Au-delà de ce nombre de cellules, un argument n'est pas re-hashé à chaque
+# consultation : la version des données passée par l'appelant l'identifie.
+EMPREINTE_MAX_CELLULES = 10_000
+
+# Mêmes réglages que st.pyplot, pour un rendu identique via st.image.
+SAVEFIG_KWARGS = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+
+def fingerprint(obj) -> str:
+    h = hashlib.sha1()
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(repr((type(obj).__name__, obj.shape)).encode())
+        if isinstance(obj, pd.DataFrame):
+            h.update(repr((list(obj.columns), [str(t) for t in obj.dtypes])).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.shape, obj.dtype.str)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    else:
+        h.update(repr(obj).encode())
+    return h.hexdigest()
+
+
+def render_png(fig: plt.Figure) -> bytes:
+    # La figure est toujours fermée : pyplot ne garde plus de référence dessus.
+    try:
+        buf = io.BytesIO()
+        fig.savefig(buf, **SAVEFIG_KWARGS)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def _empreinte(obj, version: str | None) -> str | tuple:
+    if version is not None and isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)) \
+            and obj.size > EMPREINTE_MAX_CELLULES:
+        return ("version", obj.shape)
+    return fingerprint(obj)
+
+
+class FigureCache:
+    # Images PNG déjà rendues, indexées par (fonction, version des données,
+    # empreinte des petits arguments, paramètres), avec éviction LRU au-delà
+    # de `max_octets`.
+
+    def __init__(self, max_octets: int = FIGURE_CACHE_MAX_OCTETS):
+        self.max_octets = max_octets
+        self._entrees: OrderedDict[tuple, bytes] = OrderedDict()
+        self._octets = 0
+        self._verrou = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(fn, *args, version: str | None = None, **params) -> tuple:
+        # Sans version, tous les arguments sont hashés.
+        return (
+            f"{fn.__module__}.{fn.__qualname__}",
+            version,
+            tuple(_empreinte(a, version) for a in args),
+            tuple(sorted((k, _empreinte(v, version)) for k, v in params.items())),
+        )
+
+    def get(self, fn, *args, version: str | None = None, **params) -> bytes:
+        with span(fn.__name__) as s:
+            cle = self.key(fn, *args, version=version, **params)
+            with self._verrou:
+                png = self._entrees.get(cle)
+                if png is not None:
+                    self._entrees.move_to_end(cle)
+                    self.hits += 1
+                    s.cache = "hit"
+                    return png
+                self.misses += 1
+            s.cache = "miss"
+
+            png = render_png(fn(*args, **params))
+            self.put(cle, png)
+            return png
+
+    def contains(self, cle: tuple) -> bool:
+        with self._verrou:
+            return cle in self._entrees
+
+    def put(self, cle: tuple, png: bytes) -> None:
+        if len(png) > self.max_octets:
+            return
+        with self._verrou:
+            ancien = self._entrees.pop(cle, None)
+            if ancien is not None:
+                self._octets -= len(ancien)
+            self._entrees[cle] = png
+            self._octets += len(png)
+            while self._octets > self.max_octets:
+                _, evince = self._entrees.popitem(last=False)
+                self._octets -= len(evince)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._verrou:
+            self._entrees.clear()
+            self._octets = 0
+
+    def stats(self) -> dict:
+        with self._verrou:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entrees": len(self._entrees),
+                "octets": self._octets,
+                "max_octets": self.max_octets,
+            }
+
+
+# Partagé par toutes les sessions Streamlit du processus.
+figure_cache = FigureCache()
+
+
+def cached_png(fn, *args, version: str | None = None, **params) -> bytes:
+    return figure_cache.get(fn, *args, version=version, **params)
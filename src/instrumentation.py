@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+SPANS_JSONL = Path(os.environ.get(
+    "PYFUSION_SPANS_JSONL",
+    Path(__file__).resolve().parents[1] / "data" / "spans.jsonl",
+))
+
+# Au-delà de cette taille, le fichier devient spans.jsonl.1 (l'ancien .1 est
+# écrasé) et l'export repart d'un fichier vide : au plus deux fichiers sur
+# disque. 0 désactive l'export.
+SPANS_MAX_OCTETS = int(os.environ.get("PYFUSION_SPANS_MAX_OCTETS", str(10 * 2**20)))
+
+# Le pic d'allocation passe par tracemalloc, qui ralentit tout le processus :
+# il n'est suivi que si PYFUSION_TRACEMALLOC=1 (ou si tracemalloc tourne déjà).
+if os.environ.get("PYFUSION_TRACEMALLOC", "") == "1" and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+_local = threading.local()
+_verrou_fichier = threading.Lock()
+
+
+@dataclass
+class Span:
+    nom: str
+    parent: str | None
+    profondeur: int
+    debut: float
+    mur: float = 0.0
+    cpu: float = 0.0
+    pic_octets: int | None = None
+    cache: str | None = None
+    enfants: int = 0
+
+
+def start_rerun() -> None:
+    # Les spans sont collectés par thread : chaque session Streamlit exécute
+    # son script dans son propre thread.
+    _local.spans = []
+    _local.pile = []
+    _local.debut = time.time()
+
+
+def current_spans() -> list[Span]:
+    return list(getattr(_local, "spans", None) or [])
+
+
+def end_rerun(chemin: Path = SPANS_JSONL, max_octets: int = SPANS_MAX_OCTETS, **contexte) -> list[Span]:
+    spans = current_spans()
+    _local.spans = None
+    if spans and max_octets:
+        rerun = {"rerun": _local.debut, **contexte}
+        lignes = "".join(json.dumps({**rerun, **asdict(s)}, ensure_ascii=False) + "\n" for s in spans)
+        try:
+            chemin.parent.mkdir(parents=True, exist_ok=True)
+            with _verrou_fichier:
+                if chemin.exists() and chemin.stat().st_size >= max_octets:
+                    chemin.replace(chemin.with_name(chemin.name + ".1"))
+                with open(chemin, "a", encoding="utf-8") as f:
+                    f.write(lignes)
+        except OSError:
+            pass
+    return spans
+
+
+@contextmanager
+def span(nom: str):
+    # Hors d'un rerun (worker de pré-rendu, benchmark), le span ne mesure rien.
+    spans = getattr(_local, "spans", None)
+    if spans is None:
+        yield Span(nom, None, 0, 0.0)
+        return
+
+    pile = _local.pile
+    parent = pile[-1] if pile else None
+    s = Span(nom, parent[0].nom if parent else None, len(pile), time.time())
+    if parent:
+        parent[0].enfants += 1
+    spans.append(s)
+
+    # Un seul pic global dans tracemalloc : chaque niveau de la pile garde le
+    # maximum vu jusque-là, remonté au parent à la sortie. Le pic est partagé
+    # entre les sessions qui tournent en même temps.
+    memoire = tracemalloc.is_tracing()
+    if memoire:
+        courant, pic = tracemalloc.get_traced_memory()
+        if parent:
+            parent[2] = max(parent[2], pic)
+        tracemalloc.reset_peak()
+    niveau = [s, courant if memoire else 0, courant if memoire else 0]
+    pile.append(niveau)
+
+    mur, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield s
+    finally:
+        s.mur = time.perf_counter() - mur
+        s.cpu = time.thread_time() - cpu
+        pile.pop()
+        if memoire and tracemalloc.is_tracing():
+            pic = max(niveau[2], tracemalloc.get_traced_memory()[1])
+            s.pic_octets = pic - niveau[1]
+            if parent:
+                parent[2] = max(parent[2], pic)
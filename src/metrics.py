@@ -0,0 +1,283 @@
+import threading
+from collections import OrderedDict
+
+from src.bootstrap import all_pairs, bootstrap_corr
+from src.cohortes import Cube, filter_options
+from src.correlation import METHODE, pearson_pvalues, permutation_pvalues
+from src.instrumentation import span
+from src.preprocessing import build_rapport
+from src.visualizations import SPORT_LABELS
+
+VERSIONS_MAX = 4
+
+# Cohortes mémoïsées à part, toutes sessions confondues : les sélections
+# successives ne chassent jamais le jeu complet (et son cube) du memo.
+SELECTIONS_MAX = 32
+
+# Métriques trop lentes pour la première visite d'une page (bootstrap à
+# plusieurs dizaines de secondes sur un million de lignes) : calculées en
+# arrière-plan dès qu'une nouvelle version des données arrive.
+PRECALCULEES = ("ic_conclusions",)
+
+# Paires interprétées par la page Conclusions.
+PAIRES_CONCLUSIONS = [
+    ("Sommeil_moyen", "Productivite_7j"),
+    ("Stress", "Efficacite_aujourdhui"),
+    ("Eau_litres", "Energie"),
+]
+
+
+class MetricRegistry:
+    # Métriques dérivées nommées, avec leurs dépendances déclarées. Une
+    # métrique n'est calculée que lorsqu'une page la demande, puis mémoïsée
+    # pour la version des données en cours.
+
+    def __init__(self):
+        self._definitions: dict[str, tuple] = {}
+        self._memo: OrderedDict[str, _Memo] = OrderedDict()
+        self._selections: OrderedDict[str, _Memo] = OrderedDict()
+        self._verrou = threading.Lock()
+        self._prechauffees: set[str] = set()
+
+    def metric(self, nom: str, *deps: str):
+        def enregistrer(fn):
+            self._definitions[nom] = (fn, deps)
+            return fn
+        return enregistrer
+
+    def bind(self, version: str, **entrees) -> "Metrics":
+        # Une sélection non vide désigne une cohorte du jeu `version`.
+        if entrees.get("selection"):
+            memos, taille = self._selections, SELECTIONS_MAX
+        else:
+            memos, taille = self._memo, VERSIONS_MAX
+        with self._verrou:
+            memo = memos.get(version)
+            if memo is None:
+                memo = memos[version] = _Memo()
+                while len(memos) > taille:
+                    memos.popitem(last=False)
+            else:
+                memos.move_to_end(version)
+        return Metrics(self, memo, entrees)
+
+    def warm_up(self, version: str, noms=PRECALCULEES, **entrees) -> bool:
+        # Une seule fois par version, dans un thread : le rerun en cours
+        # n'attend pas, et une page qui demande la métrique pendant le calcul
+        # attend son résultat au lieu de la recalculer.
+        with self._verrou:
+            if version in self._prechauffees:
+                return False
+            self._prechauffees.add(version)
+        m = self.bind(version, **entrees)
+        threading.Thread(target=lambda: [m[nom] for nom in noms], daemon=True).start()
+        return True
+
+
+class _Memo(dict):
+    # Valeurs calculées pour une version, avec un verrou par métrique.
+
+    def __init__(self):
+        super().__init__()
+        self.verrous: dict[str, threading.Lock] = {}
+
+    def verrou(self, nom: str) -> threading.Lock:
+        return self.verrous.setdefault(nom, threading.Lock())
+
+
+class Metrics:
+    def __init__(self, registry: MetricRegistry, memo: _Memo, entrees: dict):
+        self._registry = registry
+        self._memo = memo
+        self._entrees = entrees
+
+    def __getitem__(self, nom: str):
+        if nom in self._entrees:
+            return self._entrees[nom]
+        if nom in self._memo:
+            return self._memo[nom]
+        try:
+            fn, deps = self._registry._definitions[nom]
+        except KeyError:
+            raise KeyError(f"Métrique inconnue : {nom}") from None
+        with self._memo.verrou(nom):
+            if nom in self._memo:
+                return self._memo[nom]
+            with span(f"metric:{nom}") as s:
+                s.cache = "miss"
+                valeur = fn(*(self[d] for d in deps))
+            self._memo[nom] = valeur
+        return valeur
+
+    def computed(self) -> list[str]:
+        return list(self._memo)
+
+
+registry = MetricRegistry()
+metric = registry.metric
+
+
+@metric("n", "df")
+def _n(df):
+    return len(df)
+
+
+@metric("age_predominant", "profil")
+def _age_predominant(profil):
+    return profil.loc["Age", "modalite"]
+
+
+@metric("situation_top", "profil")
+def _situation_top(profil):
+    return profil.loc["Situation", "modalite"]
+
+
+@metric("situation_pct", "profil")
+def _situation_pct(profil):
+    return round(profil.loc["Situation", "part_mode"] * 100)
+
+
+@metric("sommeil_moy", "profil")
+def _sommeil_moy(profil):
+    return round(profil.loc["Sommeil_moyen", "moyenne"], 1)
+
+
+@metric("stress_moy", "profil")
+def _stress_moy(profil):
+    return round(profil.loc["Stress", "moyenne"], 2)
+
+
+@metric("prod_moy", "profil")
+def _prod_moy(profil):
+    return round(profil.loc["Productivite_7j", "moyenne"], 2)
+
+
+@metric("filtres", "df")
+def _filtres(df):
+    return filter_options(df)
+
+
+@metric("cube", "df", "corr")
+def _cube(df, corr):
+    # Construit une fois par version des données, à la première sélection ou
+    # à la première métrique qui en dépend, puis passé tel quel aux métriques
+    # des cohortes.
+    return Cube(df, corr.columns)
+
+
+@metric("sport_prod", "cube", "selection")
+def _sport_prod(cube, selection):
+    return cube.means(selection, "Frequence_sport")["Productivite_7j"]
+
+
+@metric("meilleur_sport_label", "sport_prod")
+def _meilleur_sport_label(sport_prod):
+    return SPORT_LABELS.get(int(sport_prod.idxmax()), "N/A")
+
+
+@metric("pearson", "cube", "selection")
+def _pearson(cube, selection):
+    # Les conclusions restent fondées sur r de Pearson, quelle que soit la
+    # méthode de la matrice affichée : lu dans le cube, pour toute cohorte.
+    moments = cube.moments(selection)
+    corr = moments.corr()
+    return corr, pearson_pvalues(corr, moments.counts())
+
+
+@metric("pearson_sommeil_prod", "pearson")
+def _pearson_sommeil_prod(pearson):
+    corr, p_values = pearson
+    return corr.loc["Sommeil_moyen", "Productivite_7j"], p_values.loc["Sommeil_moyen", "Productivite_7j"]
+
+
+@metric("pearson_stress_eff", "pearson")
+def _pearson_stress_eff(pearson):
+    corr, p_values = pearson
+    return corr.loc["Stress", "Efficacite_aujourdhui"], p_values.loc["Stress", "Efficacite_aujourdhui"]
+
+
+@metric("pearson_eau_energie", "pearson")
+def _pearson_eau_energie(pearson):
+    corr, p_values = pearson
+    return corr.loc["Eau_litres", "Energie"], p_values.loc["Eau_litres", "Energie"]
+
+
+@metric("ic_conclusions", "df")
+def _ic_conclusions(df):
+    return bootstrap_corr(df, PAIRES_CONCLUSIONS)
+
+
+@metric("ic_corr", "df", "corr")
+def _ic_corr(df, corr):
+    return bootstrap_corr(df, all_pairs(corr.columns))
+
+
+@metric("p_permutation", "df", "corr")
+def _p_permutation(df, corr):
+    # Avec Spearman, le test porte sur les rangs (r de Pearson des rangs).
+    donnees = df[list(corr.columns)]
+    return permutation_pvalues(donnees.rank() if METHODE == "spearman" else donnees)
+
+
+@metric("rapport", "profil")
+def _rapport(profil):
+    return build_rapport(profil)
+
+
+@metric(
+    "conclusions",
+    "n", "sommeil_moy", "pearson_sommeil_prod", "pearson_stress_eff", "pearson_eau_energie",
+    "ic_conclusions",
+)
+def _conclusions(n, sommeil_moy, sommeil_prod, stress_eff, eau_energie, ic):
+    # Interprétation de la page Conclusions, partagée avec les rapports batch.
+    # Un lien n'est retenu que si p < 0.05 et que son intervalle bootstrap
+    # exclut 0 : avec peu de répondants, la décision ne bascule plus d'un
+    # rafraîchissement à l'autre sur une p-value limite.
+    r_sommeil_prod, p_sommeil_prod = sommeil_prod
+    r_stress_eff,   p_stress_eff   = stress_eff
+    r_eau_energie,  p_eau_energie  = eau_energie
+    ic_sommeil_prod, ic_stress_eff, ic_eau_energie = (
+        ic.loc[paire] for paire in PAIRES_CONCLUSIONS
+    )
+
+    def retenu(p, intervalle):
+        return p < 0.05 and (intervalle["bas"] > 0 or intervalle["haut"] < 0)
+
+    def ic95(intervalle):
+        return f"IC95 [{intervalle['bas']:.2f} ; {intervalle['haut']:.2f}]"
+
+    # Sommeil
+    if retenu(p_sommeil_prod, ic_sommeil_prod):
+        sommeil = ("Significatif", "success",
+                   f"Le sommeil influence directement la productivité "
+                   f"(r={r_sommeil_prod:.2f}, {ic95(ic_sommeil_prod)}).")
+    else:
+        sommeil = ("Non significatif", "warning",
+                   "Le groupe maintient sa productivité malgré la fatigue (effort de volonté).")
+
+    # Stress
+    if retenu(p_stress_eff, ic_stress_eff):
+        stress = ("Impact Critique", "error",
+                  f"Le stress dégrade l'efficacité (r={r_stress_eff:.2f}, {ic95(ic_stress_eff)}).")
+    else:
+        stress = ("Sous contrôle", "success",
+                  "Le stress actuel n'impacte pas encore l'efficacité de manière majeure.")
+
+    # Hydratation (logique dynamique simplifiée)
+    hydro_msg = "Lien eau/énergie confirmé." if retenu(p_eau_energie, ic_eau_energie) else "Pas de lien eau/énergie clair."
+
+    recos = []
+    if sommeil_moy < 6.5:
+        recos.append(f"**Priorité Sommeil** : La moyenne de {sommeil_moy}h est trop basse. Augmenter de 30min/nuit pour stabiliser l'énergie.")
+    if r_stress_eff < -0.20:
+        recos.append("**Gestion du Stress** : L'impact sur l'efficacité est visible. Introduire des micro-pauses actives.")
+    if n < 100:
+        recos.append(f"**Fiabilité** : Collecter {100 - n} réponses supplémentaires pour valider les tendances (actuellement n={n}).")
+
+    return {
+        "sommeil": sommeil,
+        "stress": stress,
+        "hydratation": f"{hydro_msg} (r={r_eau_energie:.2f}, {ic95(ic_eau_energie)})",
+        "recos": recos,
+    }
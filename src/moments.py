@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+
+class Moments:
+    # Moyennes, co-moments centrés et min/max de colonnes numériques, mis à
+    # jour par lots (formules de Welford / Chan) : ajouter des lignes ou
+    # fusionner deux états ne demande jamais de relire l'historique.
+
+    def __init__(self, columns):
+        k = len(columns)
+        self.columns  = list(columns)
+        self.n        = 0
+        self.mean     = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+        self.min      = np.full(k, np.inf)
+        self.max      = np.full(k, -np.inf)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Moments":
+        return cls(df.columns).add(df)
+
+    def copy(self) -> "Moments":
+        autre = Moments(self.columns)
+        autre.n        = self.n
+        autre.mean     = self.mean.copy()
+        autre.comoment = self.comoment.copy()
+        autre.min      = self.min.copy()
+        autre.max      = self.max.copy()
+        return autre
+
+    def add(self, df: pd.DataFrame) -> "Moments":
+        # Les lignes incomplètes sont ignorées : l'état suppose des données
+        # déjà imputées, comme en sortie de preprocess.
+        x = df[self.columns].to_numpy(dtype="float64")
+        x = x[~np.isnan(x).any(axis=1)]
+        if len(x) == 0:
+            return self
+        lot = Moments(self.columns)
+        lot.n        = len(x)
+        lot.mean     = x.mean(axis=0)
+        centre       = x - lot.mean
+        lot.comoment = centre.T @ centre
+        lot.min      = x.min(axis=0)
+        lot.max      = x.max(axis=0)
+        self._fusionner(lot)
+        return self
+
+    def merge(self, other: "Moments") -> "Moments":
+        if other.columns != self.columns:
+            raise ValueError("Impossible de fusionner des moments sur des colonnes différentes.")
+        return self.copy()._fusionner(other)
+
+    def _fusionner(self, other: "Moments") -> "Moments":
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.comoment = (
+            self.comoment + other.comoment
+            + np.outer(delta, delta) * (self.n * other.n / n)
+        )
+        self.mean = self.mean + delta * (other.n / n)
+        self.n    = n
+        self.min  = np.minimum(self.min, other.min)
+        self.max  = np.maximum(self.max, other.max)
+        return self
+
+    def means(self) -> pd.Series:
+        moyennes = self.mean if self.n else np.full(len(self.columns), np.nan)
+        return pd.Series(moyennes, index=self.columns)
+
+    def var(self) -> pd.Series:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.Series(np.diag(self.comoment) / (self.n - 1), index=self.columns)
+
+    def corr(self) -> pd.DataFrame:
+        ecarts = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = self.comoment / np.outer(ecarts, ecarts)
+        r = np.clip(r, -1.0, 1.0)
+        np.fill_diagonal(r, np.where(ecarts > 0, 1.0, np.nan))
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+    def counts(self) -> pd.DataFrame:
+        k = len(self.columns)
+        return pd.DataFrame(np.full((k, k), self.n), index=self.columns, columns=self.columns)
+
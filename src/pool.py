@@ -0,0 +1,52 @@
+import multiprocessing
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+# Un seul échange de __main__ à la fois, quel que soit le pool qui démarre
+# des workers.
+_verrou = threading.Lock()
+
+
+@contextmanager
+def _sans_script():
+    # multiprocessing transmet aux workers le fichier de __main__ (ou le nom de
+    # son module) pour le réimporter en __mp_main__ : sous Streamlit, c'est
+    # main.py, qui serait réexécuté dans chaque worker. Pendant le démarrage,
+    # __main__ est remplacé par un module vide, puis remis en place s'il n'a
+    # pas été réaffecté entre-temps (nouveau rerun Streamlit).
+    with _verrou:
+        principal = sys.modules.get("__main__")
+        if principal is None or (getattr(principal, "__file__", None) is None
+                                 and getattr(principal, "__spec__", None) is None):
+            yield
+            return
+        vide = types.ModuleType("__main__")
+        sys.modules["__main__"] = vide
+        try:
+            yield
+        finally:
+            if sys.modules.get("__main__") is vide:
+                sys.modules["__main__"] = principal
+
+
+class _Pool(ProcessPoolExecutor):
+    # Les workers démarrent à la demande, dans submit (map passe aussi par
+    # submit) : chaque appel est couvert par _sans_script.
+
+    def submit(self, fn, /, *args, **kwargs):
+        with _sans_script():
+            return super().submit(fn, *args, **kwargs)
+
+
+def _contexte():
+    # Pas de fork d'un serveur Streamlit qui a déjà des threads actifs.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def process_pool(max_workers: int | None = None, initializer=None) -> ProcessPoolExecutor:
+    return _Pool(max_workers=max_workers, mp_context=_contexte(), initializer=initializer)
@@ -1,7 +1,16 @@
+import math
+import threading
+import warnings
+
 import pandas as pd
 import numpy as np
 import streamlit as st
 
+from src.correlation import METHODE, pearson_pvalues, rank_correlation
+from src.instrumentation import span
+from src.moments import Moments
+from src.sketches import FREQUENCES_MAX, ColumnSketch
+
 FREQ_MAP = {
     "Jamais": 0,
     "Parfois (1 à 2 fois par semaine)": 1,
@@ -42,6 +51,24 @@ BORNES = {
 }
 
 
+# Schéma compact de la sortie : libellés répétés en catégories, codes
+# ordinaux en int8, le reste des colonnes numériques en float32.
+CATEGORIES = ("Definition_productivite", "Sommeil_reparateur", "Hygiene_vie", "Age", "Situation")
+
+CODES = ("Frequence_sport", "Efficacite_aujourdhui", "Stress", "Energie", "Productivite_7j")
+
+SPORT_LABELS = {0: "Jamais", 1: "1-2x/sem", 2: "3-4x/sem", 3: "5+x/sem", 4: "Quotidien"}
+
+EFF_MAP = {1: "Mou du genou", 2: "Propre", 3: "Déterminé"}
+
+# Libellés utilisés par les figures, ajoutés une fois au DataFrame nettoyé
+# sous forme de catégories : colonne -> (colonne de codes, libellés).
+LIBELLES = {
+    "Efficacité":  ("Efficacite_aujourdhui", EFF_MAP),
+    "Sport_label": ("Frequence_sport", SPORT_LABELS),
+}
+
+
 def _convertir_sommeil(val):
     if pd.isna(val):
         return np.nan
@@ -81,6 +108,81 @@ def _convertir_sommeil(val):
         return np.nan
 
 
+UNITES_SOMMEIL = (
+    "heures", "heure", "hres", "hrs", "de temps", "de t",
+    "environ", "h", "mnt", "mn",
+)
+
+SEPARATEURS_SOMMEIL = (("ou", "-"), ("à", "-"), ("a", "-"), (" ", ""))
+
+_TIRETS_MULTIPLES = r"-{2,}"
+_NOMBRE_DECIMAL   = r"[0-9]+\.?[0-9]*|\.[0-9]+"
+_DEJA_NUMERIQUE   = r"[0-9.:,\-]*"
+
+
+def _float_ou_nan(val):
+    try:
+        return float(val)
+    except ValueError:
+        return np.nan
+
+
+def _vers_float(val: pd.Series) -> pd.Series:
+    # float() sur chaque chaîne, sans passer par Python pour les cas courants.
+    decimal = val.str.fullmatch(_NOMBRE_DECIMAL).fillna(False).astype(bool)
+    out = pd.Series(np.nan, index=val.index, dtype="float64")
+    out[decimal] = val[decimal].astype("float64")
+    # float() refuse toujours ":" et "," : "06:00" donne NaN sans autre essai.
+    reste = ~decimal & val.notna() & (val != "") & ~val.str.contains("[:,]").fillna(True).astype(bool)
+    if reste.any():
+        out[reste] = val[reste].map(_float_ou_nan).astype("float64")
+    return out
+
+
+def _nombres_valides(parts: pd.Series) -> pd.Series:
+    valides = parts.str.fullmatch(_NOMBRE_DECIMAL).fillna(False).astype(bool)
+    out = pd.Series(np.nan, index=parts.index, dtype="float64")
+    out[valides] = parts[valides].astype("float64")
+    return out
+
+
+def _convertir_sommeil_serie(series: pd.Series) -> pd.Series:
+    # Version vectorisée de _convertir_sommeil : mêmes remplacements, dans le
+    # même ordre, mais appliqués à toute la colonne d'un coup.
+    out = pd.Series(np.nan, index=series.index, dtype="float64")
+    presents = series.notna()
+    if not presents.any():
+        return out
+
+    val = series[presents].astype(str).str.lower()
+
+    # Les réponses déjà numériques ("6", "06:00", "5-6") ne contiennent aucun
+    # des motifs remplacés ci-dessous : inutile de leur faire subir la chaîne.
+    texte = ~val.str.fullmatch(_DEJA_NUMERIQUE).astype(bool)
+    if texte.any():
+        mots = val[texte]
+        for mot, chiffre in MOTS_CHIFFRES.items():
+            mots = mots.str.replace(mot, str(chiffre), regex=False)
+        for unite in UNITES_SOMMEIL:
+            mots = mots.str.replace(unite, "", regex=False)
+        mots = mots.str.strip()
+        for motif, remplacement in SEPARATEURS_SOMMEIL:
+            mots = mots.str.replace(motif, remplacement, regex=False)
+        val = val.where(~texte, mots)
+
+    val = val.str.replace(_TIRETS_MULTIPLES, "-", regex=True).str.strip("-")
+
+    plage = val.str.contains("-", regex=False)
+
+    out[val.index[~plage]] = _vers_float(val[~plage])
+
+    if plage.any():
+        parts = val[plage].str.split("-", expand=True)
+        out[parts.index] = parts.apply(_nombres_valides).mean(axis=1)
+
+    return out
+
+
 def _parse_mixed(val, text_map):
     if pd.isna(val):
         return np.nan
@@ -104,58 +206,353 @@ def _nettoyer_eau(val):
         return np.nan
 
 
-def _cap_colonne(series: pd.Series, min_val: float, max_val: float) -> pd.Series:
-    median = series.clip(lower=min_val, upper=max_val).median()
-    out_of_bounds = (series < min_val) | (series > max_val)
-    series = series.clip(lower=min_val, upper=max_val)
-    series[out_of_bounds] = median
-    return series
+def _parser_valeurs(parseur):
+    return lambda uniques: uniques.apply(parseur)
+
+
+PARSEURS = {
+    "sommeil":  _convertir_sommeil_serie,
+    "sport":    lambda uniques: uniques.map(FREQ_MAP),
+    "efficace": lambda uniques: uniques.map(PROD_MAP),
+    "stress":   _parser_valeurs(lambda val: _parse_mixed(val, STRESS_MAP)),
+    "eau":      _parser_valeurs(_nettoyer_eau),
+}
+
+COLONNES_PARSEES = {
+    "Sommeil_moyen":         "sommeil",
+    "Sommeil_nuit_derniere": "sommeil",
+    "Frequence_sport":       "sport",
+    "Efficacite_aujourdhui": "efficace",
+    "Stress":                "stress",
+    "Eau_litres":            "eau",
+}
+
+# Réponse brute -> valeur parsée, par parseur. Vit au niveau du module pour
+# survivre aux rafraîchissements (ttl=300) : seules les nouvelles réponses
+# sont parsées.
+VOCABULAIRE_MAX = 100_000
+_vocabulaires: dict[str, dict] = {}
+_verrou_vocabulaires = threading.Lock()
+
+
+def _parser_par_vocabulaire(series: pd.Series, nom: str) -> pd.Series:
+    with span(f"parse:{series.name}") as s:
+        codes, uniques = pd.factorize(series)
+        # Le verrou couvre lecture, purge et mise à jour : un clear() lancé
+        # par un autre thread ne peut pas retirer une entrée en cours de lecture.
+        with _verrou_vocabulaires:
+            table = _vocabulaires.setdefault(nom, {})
+
+            nouveaux = [u for u in uniques if u not in table]
+            s.cache = "miss" if nouveaux else "hit"
+            if nouveaux:
+                if len(table) + len(nouveaux) > VOCABULAIRE_MAX:
+                    table.clear()
+                    nouveaux = list(uniques)
+                parses = PARSEURS[nom](pd.Series(nouveaux, dtype=object))
+                table.update(zip(nouveaux, parses.to_numpy(dtype="float64", na_value=np.nan)))
+
+            # Le code -1 (valeur manquante) tombe sur le NaN ajouté en dernière position.
+            valeurs = np.fromiter((table[u] for u in uniques), dtype="float64", count=len(uniques))
+        valeurs = np.append(valeurs, np.nan)
+        return pd.Series(valeurs[codes], index=series.index, name=series.name)
+
+
+_COLONNES_BORNEES = list(BORNES)
+_BAS  = np.array([bas for bas, _ in BORNES.values()])
+_HAUT = np.array([haut for _, haut in BORNES.values()])
+
+
+def _borner(df: pd.DataFrame, medianes: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+    # Toutes les colonnes de BORNES dans une seule matrice (une colonne par
+    # variable) : un clip et un remplacement des valeurs hors bornes par la
+    # médiane, calculée sur les valeurs déjà bornées si elle n'est pas fournie.
+    x = np.empty((len(df), len(_COLONNES_BORNEES)), order="F")
+    for j, col in enumerate(_COLONNES_BORNEES):
+        x[:, j] = df[col].to_numpy(dtype="float64", na_value=np.nan)
+    hors = (x < _BAS) | (x > _HAUT)
+    np.clip(x, _BAS, _HAUT, out=x)
+    if medianes is None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            medianes = np.nanmedian(x, axis=0) if len(x) else np.full(len(_BAS), np.nan)
+    np.copyto(x, medianes, where=hors)
+    return x, medianes
 
 
 @st.cache_data
-def preprocess(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    df = df.copy()
-
-    df["Sommeil_moyen"]         = df["Sommeil_moyen"].apply(_convertir_sommeil)
-    df["Sommeil_nuit_derniere"] = df["Sommeil_nuit_derniere"].apply(_convertir_sommeil)
-    df["Frequence_sport"]       = df["Frequence_sport"].map(FREQ_MAP)
-    df["Efficacite_aujourdhui"] = df["Efficacite_aujourdhui"].map(PROD_MAP)
-    df["Productivite_7j"]       = pd.to_numeric(df["Productivite_7j"], errors="coerce")
-    df["Stress"]                = df["Stress"].apply(_parse_mixed, text_map=STRESS_MAP)
-    df["Energie"]               = pd.to_numeric(df["Energie"], errors="coerce")
-    df["Cafe"]                  = pd.to_numeric(df["Cafe"], errors="coerce")
-    df["Eau_litres"]            = df["Eau_litres"].apply(_nettoyer_eau)
-
-    for col, (min_val, max_val) in BORNES.items():
-        df[col] = _cap_colonne(df[col], min_val, max_val)
-
-    num_cols = df.select_dtypes(include=np.number).columns
-    df[num_cols] = df[num_cols].apply(
-        lambda col: col.fillna(col.mode()[0] if not col.mode().empty else 0)
-    )
+def preprocess(
+    df: pd.DataFrame, method: str = METHODE,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    with span("preprocess"):
+        return finalize(clean_rows(df), method)
 
-    df_normalized = df.copy()
-    df_normalized[num_cols] = df_normalized[num_cols].apply(
-        lambda col: (col - col.min()) / (col.max() - col.min())
-        if col.max() != col.min() else col
-    )
 
-    corr = df_normalized[num_cols].corr()
+def clean_rows(df: pd.DataFrame) -> pd.DataFrame:
+    # Étapes ligne à ligne : le résultat d'une ligne ne dépend que d'elle-même,
+    # ce qui permet de ne nettoyer que les nouvelles réponses (cf. ingestion).
+    # Copie superficielle : les colonnes sont remplacées, jamais modifiées.
+    df = df.copy(deep=False)
+
+    for col, nom in COLONNES_PARSEES.items():
+        df[col] = _parser_par_vocabulaire(df[col], nom)
+
+    with span("to_numeric"):
+        df["Productivite_7j"]       = pd.to_numeric(df["Productivite_7j"], errors="coerce")
+        df["Energie"]               = pd.to_numeric(df["Energie"], errors="coerce")
+        df["Cafe"]                  = pd.to_numeric(df["Cafe"], errors="coerce")
+    return df
+
+
+def _remplir(df: pd.DataFrame, bornees: np.ndarray, modes: dict[str, float]) -> pd.DataFrame:
+    np.copyto(bornees, np.array([modes[col] for col in _COLONNES_BORNEES]), where=np.isnan(bornees))
+    df = df.copy(deep=False)
+    for j, col in enumerate(_COLONNES_BORNEES):
+        df[col] = bornees[:, j]
+    for col, mode in modes.items():
+        if col not in BORNES and df[col].hasnans:
+            df[col] = df[col].fillna(mode)
+    return df
+
+
+def fill_values(df: pd.DataFrame) -> dict[str, dict[str, float]]:
+    # Médianes de remplacement des valeurs hors bornes, puis modes d'imputation
+    # (calculés sur les colonnes déjà bornées), exacts.
+    return Partiel.from_frame(df, math.inf).fill_values(df.select_dtypes(include=np.number).columns)
+
+
+def apply_fill_values(df: pd.DataFrame, valeurs: dict[str, dict[str, float]]) -> pd.DataFrame:
+    medianes = np.array([valeurs["medianes"][col] for col in _COLONNES_BORNEES])
+    bornees, _ = _borner(df, medianes)
+    return _remplir(df, bornees, valeurs["modes"])
+
+
+class Partiel:
+    # Profil fusionnable des colonnes nettoyées, construit en un passage : une
+    # esquisse par colonne numérique (valeurs dans les bornes pour celles de
+    # BORNES), nombre de valeurs manquantes, sous / au-dessus des bornes, somme,
+    # min et max exacts des valeurs gardées, fréquences des colonnes de
+    # CATEGORIES. Médianes et modes sont exacts tant que les esquisses le sont
+    # (cf. ColumnSketch) ; des morceaux, des workers ou des lots incrémentaux
+    # se combinent sans relire les lignes. Avec frequences_max=math.inf, les
+    # tables restent exactes quel que soit le nombre de valeurs distinctes.
+
+    def __init__(self, frequences_max: float = FREQUENCES_MAX):
+        self.frequences_max = frequences_max
+        self.esquisses: dict[str, ColumnSketch] = {}
+        self.modalites: dict[str, pd.Series] = {}
+        self.nuls: dict[str, int] = {}
+        self.sous: dict[str, int] = {}
+        self.dessus: dict[str, int] = {}
+        self.sommes: dict[str, float] = {}
+        self.min: dict[str, float] = {}
+        self.max: dict[str, float] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, frequences_max: float = FREQUENCES_MAX) -> "Partiel":
+        return cls(frequences_max).add(df)
+
+    def add(self, df: pd.DataFrame, colonnes=None) -> "Partiel":
+        if colonnes is None:
+            colonnes = [*df.select_dtypes(include=np.number).columns, *(c for c in CATEGORIES if c in df)]
+        for col in colonnes:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                self._ajouter(self.nuls, col, int(df[col].isna().sum()))
+                frequences = df[col].value_counts()
+                if col in self.modalites:
+                    frequences = self.modalites[col].add(frequences, fill_value=0)
+                self.modalites[col] = frequences
+                continue
+            x = df[col].to_numpy(dtype="float64", na_value=np.nan)
+            presents = ~np.isnan(x)
+            self._ajouter(self.nuls, col, int(len(x) - presents.sum()))
+            if col in BORNES:
+                bas, haut = BORNES[col]
+                self._ajouter(self.sous, col, int((x < bas).sum()))
+                self._ajouter(self.dessus, col, int((x > haut).sum()))
+                presents &= (x >= bas) & (x <= haut)
+            x = x[presents]
+            self.esquisses.setdefault(col, ColumnSketch(self.frequences_max)).add(x)
+            self._ajouter(self.sommes, col, float(x.sum()))
+            if len(x):
+                self.min[col] = min(self.min.get(col, np.inf), float(x.min()))
+                self.max[col] = max(self.max.get(col, -np.inf), float(x.max()))
+        return self
 
-    return df, df_normalized, corr
+    @staticmethod
+    def _ajouter(compteurs: dict, col: str, valeur) -> None:
+        compteurs[col] = compteurs.get(col, 0) + valeur
+
+    def merge(self, other: "Partiel") -> "Partiel":
+        for col, esquisse in other.esquisses.items():
+            self.esquisses.setdefault(col, ColumnSketch(self.frequences_max)).merge(esquisse)
+        for col, frequences in other.modalites.items():
+            if col in self.modalites:
+                frequences = self.modalites[col].add(frequences, fill_value=0)
+            self.modalites[col] = frequences
+        for compteurs in ("nuls", "sous", "dessus", "sommes"):
+            for col, valeur in getattr(other, compteurs).items():
+                self._ajouter(getattr(self, compteurs), col, valeur)
+        for col, valeur in other.min.items():
+            self.min[col] = min(self.min.get(col, np.inf), valeur)
+        for col, valeur in other.max.items():
+            self.max[col] = max(self.max.get(col, -np.inf), valeur)
+        return self
+
+    def _esquisse(self, col: str) -> ColumnSketch:
+        return self.esquisses.get(col) or ColumnSketch(self.frequences_max)
+
+    def _hors(self, col: str) -> int:
+        return self.sous.get(col, 0) + self.dessus.get(col, 0)
+
+    def mediane(self, col: str) -> float:
+        # Médiane des valeurs bornées : les valeurs hors bornes comptent pour
+        # la borne franchie, comme après le clip de _borner.
+        bas, haut = BORNES[col]
+        esquisse = self._esquisse(col).copy()
+        esquisse.add([bas, haut], [self.sous.get(col, 0), self.dessus.get(col, 0)])
+        return esquisse.median()
+
+    def mode(self, col: str, mediane: float | None = None) -> float:
+        # Avec `mediane`, les valeurs hors bornes lui sont d'abord attribuées,
+        # comme dans la matrice bornée de apply_fill_values.
+        esquisse = self._esquisse(col)
+        hors = self._hors(col)
+        if mediane is not None and hors:
+            esquisse = esquisse.copy().add([mediane], [hors])
+        mode = esquisse.mode()
+        return 0 if np.isnan(mode) else mode
+
+    def fill_values(self, colonnes) -> dict[str, dict[str, float]]:
+        medianes = {col: self.mediane(col) for col in BORNES}
+        modes = {
+            col: self.mode(col, medianes[col]) if col in BORNES else self.mode(col)
+            for col in colonnes
+        }
+        return {"medianes": medianes, "modes": modes}
+
+    def profile(self, valeurs: dict[str, dict[str, float]]) -> pd.DataFrame:
+        # Statistiques des colonnes après bornage et imputation, déduites du
+        # profil brut : les valeurs hors bornes deviennent la médiane, les
+        # manquantes le mode. `nuls` et `hors_bornes` comptent les valeurs
+        # remplacées. Une ligne par colonne numérique imputée, puis par colonne
+        # de CATEGORIES (mode dans `modalite`).
+        lignes = {}
+        for col, mode in valeurs["modes"].items():
+            remplacements = {}
+            if col in BORNES and self._hors(col):
+                remplacements[valeurs["medianes"][col]] = self._hors(col)
+            if self.nuls.get(col, 0):
+                remplacements[mode] = remplacements.get(mode, 0) + self.nuls[col]
+            esquisse = self._esquisse(col).copy().add(list(remplacements), list(remplacements.values()))
+            n = esquisse.n
+            somme = self.sommes.get(col, 0.0) + sum(v * k for v, k in remplacements.items())
+            extremes = [*remplacements, *([self.min[col], self.max[col]] if col in self.min else [])]
+            mode_final = esquisse.mode()
+            lignes[col] = {
+                "n":           n,
+                "nuls":        self.nuls.get(col, 0),
+                "hors_bornes": self._hors(col),
+                "moyenne":     somme / n if n else np.nan,
+                "min":         min(extremes, default=np.nan),
+                "max":         max(extremes, default=np.nan),
+                "mediane":     esquisse.median(),
+                "mode":        mode_final,
+                "modalite":    None,
+                "part_mode":   esquisse.esquisse.table.get(mode_final, np.nan) / n
+                               if esquisse.exact and n else np.nan,
+            }
+        for col, frequences in self.modalites.items():
+            frequences = frequences[frequences > 0]
+            present = float(frequences.sum())
+            modalite = frequences.index[frequences == frequences.max()].min() if present else None
+            lignes[col] = {
+                "n":           present + self.nuls.get(col, 0),
+                "nuls":        self.nuls.get(col, 0),
+                "hors_bornes": 0,
+                "moyenne":     np.nan, "min": np.nan, "max": np.nan, "mediane": np.nan, "mode": np.nan,
+                "modalite":    None if modalite is None else str(modalite),
+                "part_mode":   frequences.max() / present if present else np.nan,
+            }
+        profil = pd.DataFrame.from_dict(lignes, orient="index")
+        return profil.astype({"n": "int64", "nuls": "int64", "hors_bornes": "int64"})
+
+
+def finalize(
+    df: pd.DataFrame, method: str = METHODE,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    # Étapes globales : médianes, modes, min/max et corrélations dépendent de
+    # toutes les lignes et sont recalculés sur le jeu fusionné. Un seul passage
+    # sur les colonnes donne le profil d'où viennent médianes, modes et les
+    # statistiques servies aux pages ; le bornage n'est fait qu'une fois.
+    # Tout le jeu est en mémoire : les tables de fréquences restent exactes,
+    # les esquisses ne servent qu'aux fusions (morceaux, ingestion).
+    with span("fill_values"):
+        partiel = Partiel.from_frame(df, math.inf)
+        valeurs = partiel.fill_values(df.select_dtypes(include=np.number).columns)
+    with span("apply_fill_values"):
+        df = apply_fill_values(df, valeurs)
+    with span("moments"):
+        moments = Moments.from_frame(df[list(valeurs["modes"])])
+    return assemble(df, moments, partiel.profile(valeurs), method=method)
+
+
+def _entiers(series: pd.Series) -> bool:
+    valeurs = series.to_numpy(dtype="float64", na_value=np.nan)
+    return bool(np.all(valeurs == np.round(valeurs)))
+
+
+def compact(df: pd.DataFrame, codes=CODES) -> pd.DataFrame:
+    # Un code reste en float32 si une médiane de remplacement non entière
+    # (x.5) ou une valeur manquante y subsiste.
+    types = {col: "category" for col in CATEGORIES if col in df}
+    for col in df.select_dtypes(include=np.number).columns:
+        types[col] = "int8" if col in codes and _entiers(df[col]) else "float32"
+    return df.astype(types)
+
+
+def add_labels(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy(deep=False)
+    # Catégories construites sur les codes puis renommées : aucune chaîne
+    # n'est créée par ligne.
+    for nom, (col, libelles) in LIBELLES.items():
+        codes = pd.Categorical(df[col], categories=list(libelles))
+        df[nom] = codes.rename_categories(list(libelles.values()))
+    return df
+
+
+def assemble(
+    df: pd.DataFrame, moments: Moments, profil: pd.DataFrame, method: str = METHODE,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    with span("compact"):
+        df = add_labels(compact(df))
+    # Pearson vient des moments cumulés ; Spearman et Kendall demandent les
+    # rangs, donc toutes les lignes.
+    with span("corr"):
+        if method == "pearson":
+            corr = moments.corr()
+            p_values = pearson_pvalues(corr, moments.counts())
+        else:
+            corr, p_values = rank_correlation(df[moments.columns], method)
+    return df, corr, p_values, profil
+
+
+RAPPORT_COLONNES = {
+    "Moyenne sommeil (heures)":      "Sommeil_moyen",
+    "Moyenne sommeil nuit dernière":  "Sommeil_nuit_derniere",
+    "Moyenne productivité 7j":        "Productivite_7j",
+    "Moyenne stress":                 "Stress",
+    "Moyenne fréquence sport":        "Frequence_sport",
+    "Moyenne eau (litres)":           "Eau_litres",
+    "Moyenne énergie":                "Energie",
+    "Moyenne caféine (verres/j)":     "Cafe",
+}
 
 
-def build_rapport(df: pd.DataFrame) -> pd.DataFrame:
-    rapport = {
-        "Moyenne sommeil (heures)":      df["Sommeil_moyen"].mean(),
-        "Moyenne sommeil nuit dernière":  df["Sommeil_nuit_derniere"].mean(),
-        "Moyenne productivité 7j":        df["Productivite_7j"].mean(),
-        "Moyenne stress":                 df["Stress"].mean(),
-        "Moyenne fréquence sport":        df["Frequence_sport"].mean(),
-        "Moyenne eau (litres)":           df["Eau_litres"].mean(),
-        "Moyenne énergie":                df["Energie"].mean(),
-        "Moyenne caféine (verres/j)":     df["Cafe"].mean(),
-    }
+def build_rapport(profil: pd.DataFrame) -> pd.DataFrame:
+    # Moyennes lues dans le profil produit par preprocess.
+    moyennes = profil["moyenne"]
+    rapport = {label: moyennes[col] for label, col in RAPPORT_COLONNES.items()}
     return (
         pd.DataFrame.from_dict(rapport, orient="index", columns=["Moyenne"])
         .round(2)
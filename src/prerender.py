@@ -0,0 +1,86 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+
+from src.figure_cache import FigureCache, figure_cache, render_png
+from src.pool import process_pool
+from src.visualizations import (
+    plot_scatter_sommeil_productivite,
+    plot_distributions,
+    plot_sommeil_efficacite_kde,
+    plot_sport_productivite_energie,
+    plot_definition_productivite,
+    plot_pairplot,
+    plot_correlation,
+)
+
+# Figures affichées par chaque section de main.PAGES, avec le nom des données
+# qu'elles reçoivent (dans l'ordre des arguments).
+PAGE_FIGURES = {
+    "vue":        [(plot_distributions, ("df", "profil"))],
+    "sommeil":    [(plot_scatter_sommeil_productivite, ("df",)),
+                   (plot_sommeil_efficacite_kde, ("df",))],
+    "sport":      [(plot_sport_productivite_energie, ("df",))],
+    "definition": [(plot_definition_productivite, ("df",))],
+    "pairplot":   [(plot_pairplot, ("df",))],
+    "corr":       [(plot_correlation, ("corr", "p_values"))],
+}
+
+PRERENDER = os.environ.get("PYFUSION_PRERENDER", "1") != "0"
+PRERENDER_WORKERS = int(os.environ.get("PYFUSION_PRERENDER_WORKERS", "0")) or None
+
+_verrou = threading.Lock()
+_versions: set[str] = set()
+_pool: ProcessPoolExecutor | None = None
+
+
+def _init_worker() -> None:
+    matplotlib.use("Agg", force=True)
+
+
+def _rendre(fn, args) -> bytes:
+    return render_png(fn(*args))
+
+
+def _executor() -> ProcessPoolExecutor:
+    # Processus plutôt que threads : le rendu matplotlib garde le GIL.
+    global _pool
+    if _pool is None:
+        _pool = process_pool(PRERENDER_WORKERS, initializer=_init_worker)
+    return _pool
+
+
+def prerender(sections=None, cache: FigureCache = figure_cache, version: str | None = None, **donnees) -> int:
+    # Rend en parallèle toutes les figures des sections demandées qui ne sont
+    # pas déjà en cache ; renvoie le nombre de figures rendues.
+    taches = {}
+    for section in sections or PAGE_FIGURES:
+        for fn, noms in PAGE_FIGURES[section]:
+            args = tuple(donnees[nom] for nom in noms)
+            cle = cache.key(fn, *args, version=version)
+            if not cache.contains(cle):
+                taches[cle] = (fn, args)
+    if not taches:
+        return 0
+
+    with _verrou:
+        executor = _executor()
+    futures = {executor.submit(_rendre, fn, args): cle for cle, (fn, args) in taches.items()}
+    for future in as_completed(futures):
+        cache.put(futures[future], future.result())
+    return len(futures)
+
+
+def warm_up(version: str, **donnees) -> bool:
+    # Lancé une seule fois par version de données, en arrière-plan : le
+    # rerun en cours n'attend pas la fin du pré-rendu.
+    if not PRERENDER:
+        return False
+    with _verrou:
+        if version in _versions:
+            return False
+        _versions.add(version)
+    threading.Thread(target=prerender, kwargs={"version": version, **donnees}, daemon=True).start()
+    return True
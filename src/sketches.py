@@ -0,0 +1,240 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Au-delà de ce nombre de valeurs distinctes, une colonne passe d'une table de
+# fréquences exacte à une esquisse de quantiles.
+FREQUENCES_MAX = 4096
+
+# Erreur relative maximale des quantiles et du mode d'une esquisse.
+PRECISION = 0.005
+
+
+def _regrouper(valeurs: np.ndarray, poids) -> pd.Series:
+    if poids is None:
+        return pd.Series(valeurs).value_counts(sort=False).astype("float64")
+    poids = np.asarray(poids, dtype="float64")
+    ajout = pd.Series(poids[poids > 0], index=np.asarray(valeurs)[poids > 0])
+    return ajout if ajout.index.is_unique else ajout.groupby(level=0).sum()
+
+
+def _cumuler(table: pd.Series, ajout: pd.Series) -> pd.Series:
+    if table.empty:
+        return ajout
+    return table.add(ajout, fill_value=0)
+
+
+def _minimum(table: pd.Series, ajout: pd.Series) -> pd.Series:
+    if table.empty:
+        return ajout
+    return table.combine(ajout, min, fill_value=np.inf)
+
+
+class Frequences:
+    # Table exacte valeur -> effectif. Quantiles interpolés comme np.quantile
+    # (médiane = moyenne des deux valeurs centrales) ; mode = plus petite des
+    # valeurs les plus fréquentes, comme Series.mode()[0].
+
+    def __init__(self):
+        self.table = pd.Series(dtype="float64")
+
+    @property
+    def n(self) -> float:
+        return float(self.table.sum())
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def copy(self) -> "Frequences":
+        autre = Frequences()
+        autre.table = self.table.copy()
+        return autre
+
+    def add(self, valeurs: np.ndarray, poids=None) -> "Frequences":
+        if len(valeurs):
+            self.table = _cumuler(self.table, _regrouper(valeurs, poids))
+        return self
+
+    def merge(self, other: "Frequences") -> "Frequences":
+        self.table = _cumuler(self.table, other.table)
+        return self
+
+    def quantile(self, q: float) -> float:
+        table = self.table[self.table > 0].sort_index()
+        if table.empty:
+            return np.nan
+        cumul = table.to_numpy().cumsum()
+        position = q * (cumul[-1] - 1)
+        bas, haut = math.floor(position), math.ceil(position)
+        a, b = table.index[np.searchsorted(cumul, [bas, haut], side="right")]
+        f = position - bas
+        return float(a) if f == 0 else float((1 - f) * a + f * b)
+
+    def mode(self) -> float:
+        table = self.table[self.table > 0]
+        if table.empty:
+            return np.nan
+        return float(table.index[table == table.max()].min())
+
+
+class QuantileSketch:
+    # Esquisse à erreur relative bornée (DDSketch) : chaque valeur tombe dans
+    # un seau logarithmique [γ^(i-1), γ^i], γ = (1+α)/(1-α), représenté par
+    # 2γ^i/(γ+1) ; tout quantile est estimé à α près en relatif. Deux
+    # esquisses de même précision se fusionnent en additionnant les seaux.
+    # Le nombre de seaux croît avec log(max/min), pas avec le nombre de lignes.
+    # Chaque seau garde aussi la plus petite valeur réellement vue : le mode
+    # renvoie cette valeur pour le seau le plus peuplé, jamais un représentant
+    # inventé. C'est une approximation du mode (le seau modal, à α près).
+
+    def __init__(self, precision: float = PRECISION):
+        self.precision = precision
+        self.gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = math.log(self.gamma)
+        self.positifs = pd.Series(dtype="float64")
+        self.negatifs = pd.Series(dtype="float64")
+        self.zeros = 0.0
+        # Seau -> plus petite valeur observée (en valeur signée).
+        self.min_positifs = pd.Series(dtype="float64")
+        self.min_negatifs = pd.Series(dtype="float64")
+
+    @classmethod
+    def from_frequences(cls, frequences: Frequences, precision: float = PRECISION) -> "QuantileSketch":
+        table = frequences.table
+        return cls(precision).add(table.index.to_numpy(dtype="float64"), table.to_numpy())
+
+    @property
+    def n(self) -> float:
+        return float(self.positifs.sum() + self.negatifs.sum() + self.zeros)
+
+    def copy(self) -> "QuantileSketch":
+        autre = QuantileSketch(self.precision)
+        autre.positifs = self.positifs.copy()
+        autre.negatifs = self.negatifs.copy()
+        autre.zeros = self.zeros
+        autre.min_positifs = self.min_positifs.copy()
+        autre.min_negatifs = self.min_negatifs.copy()
+        return autre
+
+    def add(self, valeurs: np.ndarray, poids=None) -> "QuantileSketch":
+        valeurs = np.asarray(valeurs, dtype="float64")
+        poids = np.ones(len(valeurs)) if poids is None else np.asarray(poids, dtype="float64")
+        nuls = valeurs == 0
+        self.zeros += float(poids[nuls].sum())
+        for signe, store in ((1, "positifs"), (-1, "negatifs")):
+            choisis = (signe * valeurs > 0) & (poids > 0)
+            if choisis.any():
+                seaux = np.ceil(np.log(signe * valeurs[choisis]) / self._log_gamma).astype("int64")
+                setattr(self, store, _cumuler(getattr(self, store), _regrouper(seaux, poids[choisis])))
+                minima = pd.Series(valeurs[choisis]).groupby(seaux).min()
+                setattr(self, f"min_{store}", _minimum(getattr(self, f"min_{store}"), minima))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.precision != self.precision:
+            raise ValueError("Impossible de fusionner des esquisses de précisions différentes.")
+        self.positifs = _cumuler(self.positifs, other.positifs)
+        self.negatifs = _cumuler(self.negatifs, other.negatifs)
+        self.zeros += other.zeros
+        self.min_positifs = _minimum(self.min_positifs, other.min_positifs)
+        self.min_negatifs = _minimum(self.min_negatifs, other.min_negatifs)
+        return self
+
+    def _valeurs(self) -> tuple[np.ndarray, np.ndarray]:
+        # Représentants des seaux en ordre croissant, avec leurs effectifs.
+        negatifs = self.negatifs.sort_index(ascending=False)
+        positifs = self.positifs.sort_index()
+        representants = np.concatenate([
+            -self._representant(negatifs.index.to_numpy()), [0.0],
+            self._representant(positifs.index.to_numpy()),
+        ])
+        effectifs = np.concatenate([negatifs.to_numpy(), [self.zeros], positifs.to_numpy()])
+        return representants, effectifs
+
+    def _representant(self, seaux: np.ndarray) -> np.ndarray:
+        return 2 * self.gamma ** seaux.astype("float64") / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        representants, effectifs = self._valeurs()
+        cumul = effectifs.cumsum()
+        if cumul[-1] == 0:
+            return np.nan
+        rang = q * (cumul[-1] - 1)
+        return float(representants[np.searchsorted(cumul, rang, side="right")])
+
+    def mode(self) -> float:
+        # Plus petite valeur vue dans le seau le plus peuplé (à égalité, le
+        # seau des plus petites valeurs).
+        negatifs = self.negatifs.sort_index(ascending=False)
+        positifs = self.positifs.sort_index()
+        effectifs = np.concatenate([negatifs.to_numpy(), [self.zeros], positifs.to_numpy()])
+        if effectifs.max() == 0:
+            return np.nan
+        valeurs = np.concatenate([
+            self.min_negatifs.reindex(negatifs.index).to_numpy(), [0.0],
+            self.min_positifs.reindex(positifs.index).to_numpy(),
+        ])
+        return float(valeurs[np.argmax(effectifs)])
+
+
+class ColumnSketch:
+    # Résumé fusionnable d'une colonne numérique : exact (Frequences) tant que
+    # la colonne a peu de valeurs distinctes, comme les échelles de Likert ou
+    # les heures de sommeil saisies, puis QuantileSketch au-delà de
+    # `frequences_max`. Les NaN sont ignorés.
+
+    def __init__(self, frequences_max: int = FREQUENCES_MAX, precision: float = PRECISION):
+        self.frequences_max = frequences_max
+        self.precision = precision
+        self.esquisse: Frequences | QuantileSketch = Frequences()
+
+    @property
+    def exact(self) -> bool:
+        return isinstance(self.esquisse, Frequences)
+
+    @property
+    def n(self) -> float:
+        return self.esquisse.n
+
+    def copy(self) -> "ColumnSketch":
+        autre = ColumnSketch(self.frequences_max, self.precision)
+        autre.esquisse = self.esquisse.copy()
+        return autre
+
+    def add(self, valeurs, poids=None) -> "ColumnSketch":
+        valeurs = np.asarray(valeurs, dtype="float64")
+        if poids is not None:
+            poids = np.asarray(poids, dtype="float64")
+        presents = ~np.isnan(valeurs)
+        if not presents.all():
+            valeurs = valeurs[presents]
+            poids = poids[presents] if poids is not None else None
+        self.esquisse.add(valeurs, poids)
+        self._basculer()
+        return self
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        if self.exact and other.exact:
+            self.esquisse.merge(other.esquisse)
+            self._basculer()
+            return self
+        self._basculer(force=True)
+        autre = other.esquisse
+        if isinstance(autre, Frequences):
+            autre = QuantileSketch.from_frequences(autre, self.precision)
+        self.esquisse.merge(autre)
+        return self
+
+    def _basculer(self, force: bool = False) -> None:
+        if self.exact and (force or len(self.esquisse) > self.frequences_max):
+            self.esquisse = QuantileSketch.from_frequences(self.esquisse, self.precision)
+
+    def quantile(self, q: float) -> float:
+        return self.esquisse.quantile(q)
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def mode(self) -> float:
+        return self.esquisse.mode()
@@ -0,0 +1,85 @@
+import io
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.correlation import METHODE
+from src.data_loader import normalize_columns
+from src.instrumentation import span
+from src.moments import Moments
+from src.preprocessing import CATEGORIES, Partiel, apply_fill_values, assemble, clean_rows
+
+# Mode de prétraitement par morceaux : activé par PYFUSION_CHUNK_LIGNES=<lignes>
+# (0 ou absent : tout l'export est lu d'un coup).
+CHUNK_LIGNES = int(os.environ.get("PYFUSION_CHUNK_LIGNES", "0") or 0)
+
+
+def read_chunks(source: bytes | str | Path, taille: int):
+    # Export brut (corps téléchargé ou chemin local) lu par blocs de `taille`
+    # lignes, en-têtes déjà renommés.
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with pd.read_csv(source, chunksize=taille) as lecteur:
+        for chunk in lecteur:
+            yield normalize_columns(chunk)
+
+
+def _numeriques(chunk: pd.DataFrame) -> set[str]:
+    # Une colonne brute n'est numérique que si elle l'est dans chaque morceau
+    # où elle a des valeurs (sinon read_csv l'aurait lue en texte sur l'export
+    # entier).
+    vides = {col for col in chunk.columns if not chunk[col].notna().any()}
+    return set(chunk.select_dtypes(include=np.number).columns) | vides
+
+
+def _categories(chunks: list[pd.DataFrame]) -> None:
+    # Mêmes catégories (triées, comme astype("category")) dans chaque morceau,
+    # pour que la concaténation les garde.
+    for col in CATEGORIES:
+        if col not in chunks[0]:
+            continue
+        toutes = sorted(set().union(*(chunk[col].cat.categories for chunk in chunks)))
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(toutes)
+
+
+def preprocess_chunks(chunks, method: str = METHODE) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    # Mêmes sorties que preprocess, sans jamais tenir l'export brut en entier :
+    # chaque morceau est nettoyé puis gardé sous forme compacte, et seuls les
+    # partiels fusionnés servent aux médianes et modes. Un second passage sur
+    # les morceaux nettoyés les borne, les impute et cumule les moments.
+    # Les morceaux gardés sont en O(N), comme le frame final qu'ils forment :
+    # seuls la lecture et le nettoyage sont bornés par la taille des morceaux.
+    propres, partiel = [], Partiel()
+    numeriques = None
+    for chunk in chunks:
+        chunk = clean_rows(chunk)
+        numeriques = _numeriques(chunk) if numeriques is None else numeriques & _numeriques(chunk)
+        partiel.add(chunk)
+        propres.append(chunk.astype({col: "category" for col in CATEGORIES if col in chunk}))
+    if not propres:
+        raise ValueError("Export vide : aucune ligne à prétraiter.")
+
+    numeriques = [col for col in propres[0].columns if col in numeriques]
+    with span("fill_values"):
+        valeurs = partiel.fill_values(numeriques)
+
+    moments = Moments(numeriques)
+    with span("apply_fill_values"):
+        for i, chunk in enumerate(propres):
+            chunk = apply_fill_values(chunk, valeurs)
+            moments.add(chunk)
+            propres[i] = chunk.astype({col: "float32" for col in numeriques})
+    _categories(propres)
+    df = pd.concat(propres, ignore_index=True)
+    del propres
+    return assemble(df, moments, partiel.profile(valeurs), method=method)
+
+
+def preprocess_stream(
+    source: bytes | str | Path, taille: int = CHUNK_LIGNES, method: str = METHODE,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    with span("preprocess_stream"):
+        return preprocess_chunks(read_chunks(source, taille), method)
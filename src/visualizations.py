@@ -1,10 +1,15 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
 import matplotlib.patches as mpatches
 import seaborn as sns
 from scipy import stats
 
+from src.kde import binned_kde
+from src.correlation import METHODE
+from src.preprocessing import SPORT_LABELS
+
 ESIH_RED   = "#A41E37"
 ESIH_LIGHT = "#f5e6e9"
 GREY       = "#555555"
@@ -22,19 +27,17 @@ LABELS = {
     "Energie"              : "Énergie aujourd'hui",
 }
 
-SPORT_LABELS = {0: "Jamais", 1: "1-2x/sem", 2: "3-4x/sem", 3: "5+x/sem", 4: "Quotidien"}
-
-EFF_MAP = {1: "Mou du genou", 2: "Propre", 3: "Déterminé"}
-
 EFF_PALETTE = {
     "Mou du genou": "#e8a0ab",
     "Propre":       "#c45c72",
     "Déterminé":    ESIH_RED,
 }
 
+# Pied de la matrice de corrélation, complété par le libellé de COEFFICIENTS
+# de la méthode affichée.
 FOOTER = (
     "Source : PyFusion · ESIH  |  "
-    "Corrélation de Pearson sur données normalisées  |  "
+    "{coefficient}  |  "
     "Seuil de significativité : p < 0.05"
 )
 
@@ -79,18 +82,25 @@ def plot_scatter_sommeil_productivite(df: pd.DataFrame) -> plt.Figure:
     return fig
 
 
-def plot_distributions(df: pd.DataFrame) -> plt.Figure:
+def plot_distributions(df: pd.DataFrame, profil: pd.DataFrame) -> plt.Figure:
     fig, axes = plt.subplots(1, 3, figsize=(15, 4))
     _style(fig, axes)
 
+    moyennes = profil["moyenne"]
     configs = [
-        ("Sommeil_moyen", "Sommeil moyen (h)",  df["Sommeil_moyen"].mean(), 8,    "Recommandé : 8h"),
-        ("Stress",        "Niveau de stress",    df["Stress"].mean(),         None, None),
-        ("Energie",       "Énergie aujourd'hui", df["Energie"].mean(),         None, None),
+        ("Sommeil_moyen", "Sommeil moyen (h)",  moyennes["Sommeil_moyen"], 8,    "Recommandé : 8h"),
+        ("Stress",        "Niveau de stress",    moyennes["Stress"],        None, None),
+        ("Energie",       "Énergie aujourd'hui", moyennes["Energie"],       None, None),
     ]
 
     for ax, (col, title, mean_val, ref_val, ref_label) in zip(axes, configs):
-        sns.histplot(data=df, x=col, kde=True, ax=ax, color=ESIH_RED, alpha=0.6)
+        valeurs = df[col].dropna().to_numpy(dtype="float64")
+        bins = np.histogram_bin_edges(valeurs, bins="auto")
+        sns.histplot(data=df, x=col, bins=bins, ax=ax, color=ESIH_RED, alpha=0.6)
+        # Courbe KDE à l'échelle des comptes, comme histplot(kde=True) (cut=0).
+        grille, densite = binned_kde(valeurs, cut=0)
+        if len(grille):
+            ax.plot(grille, densite * len(valeurs) * np.diff(bins).mean(), color=ESIH_RED)
         ax.axvline(mean_val, color=GREY, linestyle="--", lw=1.8, label=f"Moy: {mean_val:.1f}")
         if ref_val:
             ax.axvline(ref_val, color="#888", linestyle=":", lw=1.5, label=ref_label)
@@ -106,14 +116,25 @@ def plot_sommeil_efficacite_kde(df: pd.DataFrame) -> plt.Figure:
     fig, ax = plt.subplots(figsize=(8, 5))
     _style(fig, ax)
 
-    df_plot = df.copy()
-    df_plot["Efficacité"] = df_plot["Efficacite_aujourdhui"].map(EFF_MAP)
-
-    sns.kdeplot(
-        data=df_plot, x="Sommeil_moyen",
-        hue="Efficacité", fill=True, alpha=0.4, ax=ax,
-        palette=EFF_PALETTE,
-    )
+    efficacite = df["Efficacité"]
+    sommeil = df["Sommeil_moyen"]
+    total = int((efficacite.notna() & sommeil.notna()).sum())
+
+    # Densités par classe normalisées ensemble (common_norm de seaborn) :
+    # chaque courbe est pondérée par la part de sa classe.
+    handles = []
+    for label, couleur in EFF_PALETTE.items():
+        valeurs = sommeil[efficacite == label].dropna().to_numpy(dtype="float64")
+        grille, densite = binned_kde(valeurs)
+        if not len(grille):
+            continue
+        densite = densite * len(valeurs) / total
+        ax.fill_between(grille, densite, color=couleur, alpha=0.4, lw=0)
+        ax.plot(grille, densite, color=couleur, lw=1.2)
+        handles.append(mpatches.Patch(color=couleur, alpha=0.4, label=label))
+    if handles:
+        ax.legend(handles=handles, title="Efficacité")
+    ax.set_ylabel("Density")
     ax.set_title("Distribution du sommeil par efficacité", fontsize=13, fontweight="bold", color=ESIH_RED)
     ax.set_xlabel("Heures de sommeil moyen")
     ax.grid(True, linestyle="--", alpha=0.3)
@@ -125,14 +146,12 @@ def plot_sport_productivite_energie(df: pd.DataFrame) -> plt.Figure:
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     _style(fig, axes)
 
-    df_plot = df.copy()
-    df_plot["Sport_label"] = df_plot["Frequence_sport"].map(SPORT_LABELS)
     order = list(SPORT_LABELS.values())
 
     palette_reds = [ESIH_LIGHT, "#d4748a", "#c45c72", "#a83050", ESIH_RED]
 
     sns.boxplot(
-        data=df_plot, x="Sport_label", y="Productivite_7j",
+        data=df, x="Sport_label", y="Productivite_7j",
         order=order, ax=axes[0], palette=palette_reds,
     )
     axes[0].set_title("Sport → Productivité 7j", fontweight="bold", color=ESIH_RED)
@@ -140,7 +159,7 @@ def plot_sport_productivite_energie(df: pd.DataFrame) -> plt.Figure:
     axes[0].set_ylabel("Productivité 7 jours")
 
     sns.barplot(
-        data=df_plot, x="Sport_label", y="Energie",
+        data=df, x="Sport_label", y="Energie",
         order=order, ax=axes[1], palette=palette_reds, errorbar="sd",
     )
     axes[1].set_title("Sport → Énergie", fontweight="bold", color=ESIH_RED)
@@ -156,7 +175,7 @@ def plot_definition_productivite(df: pd.DataFrame) -> plt.Figure:
     _style(fig, ax)
 
     order = (
-        df.groupby("Definition_productivite")["Productivite_7j"]
+        df.groupby("Definition_productivite", observed=True)["Productivite_7j"]
         .mean()
         .sort_values(ascending=False)
         .index
@@ -180,13 +199,60 @@ def plot_definition_productivite(df: pd.DataFrame) -> plt.Figure:
     return fig
 
 
-def plot_pairplot(df: pd.DataFrame) -> plt.Figure:
-    cols = ["Sommeil_moyen", "Stress", "Energie", "Productivite_7j"]
-    df_plot = df[cols].copy()
-    df_plot["Efficacité"] = df["Efficacite_aujourdhui"].map(EFF_MAP)
+PAIRPLOT_COLS = ["Sommeil_moyen", "Stress", "Energie", "Productivite_7j"]
+
+# Au-delà de ce nombre de lignes, le pairplot passe en mode densité
+# (histogrammes 2D et histogrammes par classe) au lieu d'un nuage par point.
+PAIRPLOT_SEUIL = 5_000
+
+DENSITE_CMAP = sns.light_palette(ESIH_RED, as_cmap=True)
+
+
+def _bords(serie: pd.Series, max_bins: int = 30) -> np.ndarray:
+    # Variables discrètes (échelles 1-5, heures rondes) : une case par valeur.
+    valeurs = np.unique(serie.dropna().to_numpy())
+    if len(valeurs) == 0:
+        return np.array([0.0, 1.0])
+    if len(valeurs) <= 12 and np.allclose(valeurs, np.round(valeurs * 2) / 2):
+        pas = 0.5 if np.any(valeurs % 1) else 1.0
+        return np.arange(valeurs[0] - pas / 2, valeurs[-1] + pas, pas)
+    lo, hi = valeurs[0], valeurs[-1]
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, max_bins + 1)
+
+
+def _indices_bins(valeurs: np.ndarray, bords: np.ndarray) -> np.ndarray:
+    # Les bords de _bords sont réguliers : l'indice de case est un simple
+    # calcul affine, bien plus rapide que la recherche de np.histogram.
+    pas = bords[1] - bords[0]
+    idx = np.floor((valeurs - bords[0]) / pas).astype(np.int64)
+    idx[valeurs == bords[-1]] = len(bords) - 2
+    idx[(idx < 0) | (idx > len(bords) - 2) | np.isnan(valeurs)] = -1
+    return idx
+
+
+def stratified_sample(df: pd.DataFrame, by: str, n: int, seed: int = 0) -> pd.DataFrame:
+    # Échantillon proportionnel à chaque strate, reproductible.
+    if n <= 0 or len(df) == 0:
+        return df.iloc[:0]
+    if n >= len(df):
+        return df
+    frac = n / len(df)
+    # Une catégorie est groupée par son code (-1 pour NaN) : groupby.sample
+    # ne sait pas tirer dans le groupe NaN d'une clé catégorielle.
+    cle = df[by]
+    if isinstance(cle.dtype, pd.CategoricalDtype):
+        cle = cle.cat.codes
+    return df.groupby(cle, group_keys=False, dropna=False).sample(frac=frac, random_state=seed)
+
+
+def plot_pairplot(df: pd.DataFrame, seuil: int = PAIRPLOT_SEUIL, points: int = 0) -> plt.Figure:
+    if len(df) > seuil:
+        return _plot_pairplot_densite(df, points)
 
     g = sns.pairplot(
-        df_plot, hue="Efficacité",
+        df, vars=PAIRPLOT_COLS, hue="Efficacité",
         palette=EFF_PALETTE,
         plot_kws={"alpha": 0.7},
         diag_kind="kde",
@@ -198,15 +264,80 @@ def plot_pairplot(df: pd.DataFrame) -> plt.Figure:
     return g.figure
 
 
-def plot_correlation(corr: pd.DataFrame, df_normalized: pd.DataFrame) -> plt.Figure:
-    corr_labeled = corr.rename(index=LABELS, columns=LABELS)
+def _plot_pairplot_densite(df: pd.DataFrame, points: int = 0) -> plt.Figure:
+    # Coût de rendu indépendant du nombre de lignes : seules des grilles de
+    # comptage (numpy) sont dessinées, plus `points` répondants tirés par
+    # strate d'efficacité si on veut superposer des points.
+    k = len(PAIRPLOT_COLS)
+    fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k))
+    _style(fig, axes.ravel())
+
+    bords = {col: _bords(df[col]) for col in PAIRPLOT_COLS}
+    idx = {col: _indices_bins(df[col].to_numpy(dtype="float64"), bords[col]) for col in PAIRPLOT_COLS}
+    efficacite = df["Efficacité"]
+    groupes = {label: (efficacite == label).to_numpy() for label in EFF_PALETTE}
+    overlay = stratified_sample(df, "Efficacité", points)
+
+    for i, y in enumerate(PAIRPLOT_COLS):
+        for j, x in enumerate(PAIRPLOT_COLS):
+            ax = axes[i, j]
+            nx, ny = len(bords[x]) - 1, len(bords[y]) - 1
+            if i == j:
+                for label, couleur in EFF_PALETTE.items():
+                    cases = idx[x][groupes[label] & (idx[x] >= 0)]
+                    if len(cases) == 0:
+                        continue
+                    compte = np.bincount(cases, minlength=nx) / (len(cases) * np.diff(bords[x]))
+                    ax.stairs(compte, bords[x], color=couleur, fill=True, alpha=0.4)
+                    ax.stairs(compte, bords[x], color=couleur, lw=1.2)
+            else:
+                valides = (idx[x] >= 0) & (idx[y] >= 0)
+                compte = np.bincount(idx[x][valides] * ny + idx[y][valides], minlength=nx * ny)
+                compte = np.ma.masked_equal(compte.reshape(nx, ny).astype("float64"), 0)
+                ax.pcolormesh(
+                    bords[x], bords[y], compte.T, cmap=DENSITE_CMAP,
+                    norm=mcolors.LogNorm(vmin=1, vmax=max(compte.max(), 1)),
+                )
+                if not overlay.empty:
+                    ax.scatter(
+                        overlay[x], overlay[y], s=6, alpha=0.6, linewidths=0,
+                        c=overlay["Efficacité"].map(EFF_PALETTE).astype(object).fillna(GREY),
+                    )
+            ax.set_xlabel(x if i == k - 1 else "")
+            ax.set_ylabel(y if j == 0 else "")
+
+    fig.legend(
+        handles=[mpatches.Patch(color=c, label=l) for l, c in EFF_PALETTE.items()],
+        title="Efficacité", loc="center right", frameon=False,
+    )
+    fig.suptitle(
+        f"Pairplot — Sommeil, Stress, Énergie, Productivité (densité, n={len(df):_})".replace("_", " "),
+        y=1.02, fontsize=13, fontweight="bold", color=ESIH_RED,
+    )
+    fig.tight_layout(rect=(0, 0, 0.88, 1))
+    return fig
+
 
-    num_data = df_normalized[list(LABELS.keys())]
-    p_values = num_data.apply(
-        lambda col_a: num_data.apply(
-            lambda col_b: stats.pearsonr(col_a, col_b)[1]
-        )
-    ).rename(index=LABELS, columns=LABELS)
+# Légende de la mention « ns » selon l'origine des p-values.
+SIGNIFICATIVITE = {
+    "pearson":     "ns = non significatif (p >= 0.05)",
+    "permutation": "ns = non significatif (permutations, p >= 0.05)",
+}
+
+
+# Libellé de l'échelle selon le coefficient de la matrice.
+COEFFICIENTS = {
+    "pearson":  "Coefficient de Pearson (r)",
+    "spearman": "Coefficient de Spearman (ρ)",
+    "kendall":  "Tau-b de Kendall (τ)",
+}
+
+
+def plot_correlation(
+    corr: pd.DataFrame, p_values: pd.DataFrame, significativite: str = "pearson", method: str = METHODE,
+) -> plt.Figure:
+    corr_labeled = corr.rename(index=LABELS, columns=LABELS)
+    p_values     = p_values.reindex(index=corr.index, columns=corr.columns).rename(index=LABELS, columns=LABELS)
 
     mask_upper = np.triu(np.ones_like(corr_labeled, dtype=bool), k=1)
     mask_sig   = (p_values >= 0.05) & ~mask_upper
@@ -222,7 +353,7 @@ def plot_correlation(corr: pd.DataFrame, df_normalized: pd.DataFrame) -> plt.Fig
         linewidths=0.6, linecolor="white",
         annot_kws={"size": 10, "weight": "bold"},
         square=True,
-        cbar_kws={"shrink": 0.75, "label": "Coefficient de Pearson (r)"},
+        cbar_kws={"shrink": 0.75, "label": COEFFICIENTS[method]},
     )
 
     annot_ns = corr_labeled.copy().astype(str)
@@ -248,7 +379,7 @@ def plot_correlation(corr: pd.DataFrame, df_normalized: pd.DataFrame) -> plt.Fig
         mpatches.Patch(color=ESIH_RED,   label="Corrélation positive forte (→ 1)"),
         mpatches.Patch(color="#3a6186",  label="Corrélation négative forte (→ -1)"),
         mpatches.Patch(color="#f7f7f7",  label="Pas de lien (→ 0)"),
-        mpatches.Patch(facecolor="white", edgecolor=GREY, label="ns = non significatif (p >= 0.05)"),
+        mpatches.Patch(facecolor="white", edgecolor=GREY, label=SIGNIFICATIVITE[significativite]),
     ]
     ax.legend(
         handles=patches, loc="upper right",
@@ -256,7 +387,7 @@ def plot_correlation(corr: pd.DataFrame, df_normalized: pd.DataFrame) -> plt.Fig
         frameon=True, framealpha=0.9, edgecolor="#ddd",
     )
 
-    fig.text(0.5, 0.01, FOOTER, ha="center", fontsize=8, color=GREY, style="italic")
+    fig.text(0.5, 0.01, FOOTER.format(coefficient=COEFFICIENTS[method]), ha="center", fontsize=8, color=GREY, style="italic")
     plt.tight_layout()
     
     return fig
\ No newline at end of file
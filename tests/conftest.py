@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+import pytest
+
+matplotlib.use("Agg")
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE))
+sys.path.insert(0, str(RACINE / "benchmarks"))
+
+from generateur import generer  # noqa: E402
+from src.data_loader import normalize_columns  # noqa: E402
+from src.sketches import FREQUENCES_MAX  # noqa: E402
+
+
+@pytest.fixture
+def brut():
+    return normalize_columns(generer(3_000, seed=3))
+
+
+@pytest.fixture
+def brut_continu():
+    # Eau et sommeil saisis au centième près, avec des manquants et des
+    # valeurs hors bornes : plus de FREQUENCES_MAX valeurs distinctes.
+    df = normalize_columns(generer(3 * FREQUENCES_MAX, seed=4))
+    rng = np.random.default_rng(4)
+    eau = np.round(rng.gamma(2, 0.8, len(df)), 5)
+    sommeil = np.round(rng.normal(7, 1.5, len(df)), 4)
+    sommeil[:20] = 15.0
+    df["Eau_litres"] = np.where(rng.random(len(df)) < 0.05, None, eau.astype(str))
+    df["Sommeil_moyen"] = np.where(rng.random(len(df)) < 0.05, None, sommeil.astype(str))
+    return df
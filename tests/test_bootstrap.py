@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import bootstrap
+from src.bootstrap import all_pairs, bootstrap_corr
+from src.metrics import PAIRES_CONCLUSIONS
+from src.preprocessing import clean_rows, finalize
+
+
+@pytest.fixture
+def df(brut):
+    return finalize(clean_rows(brut))[0]
+
+
+def _naif(df, paires, tirages, niveau, graine):
+    # Un rééchantillon à la fois, mêmes indices que les lots de bootstrap_corr.
+    colonnes = list(dict.fromkeys(c for p in paires for c in p))
+    x = df[colonnes].to_numpy(dtype="float64")
+    n = len(x)
+    b = min(tirages, max(bootstrap.LOT_MIN, bootstrap.LOT_ELEMENTS // n))
+    tailles = [b] * (tirages // b) + ([tirages % b] if tirages % b else [])
+    r = []
+    for graine_lot, taille in zip(np.random.SeedSequence(graine).spawn(len(tailles)), tailles):
+        for indices in np.random.default_rng(graine_lot).integers(0, n, size=(taille, n)):
+            tirage = pd.DataFrame(x[indices], columns=colonnes)
+            r.append([tirage[a].corr(tirage[c]) for a, c in paires])
+    alpha = (1 - niveau) / 2
+    bas, haut = np.nanquantile(np.array(r), [alpha, 1 - alpha], axis=0)
+    return bas, haut
+
+
+def test_lots_identiques_aux_reechantillons_naifs(df, monkeypatch):
+    monkeypatch.setattr(bootstrap, "LOT_ELEMENTS", 40 * len(df))
+    ic = bootstrap_corr(df, PAIRES_CONCLUSIONS, tirages=100, graine=3)
+    bas, haut = _naif(df, PAIRES_CONCLUSIONS, 100, 0.95, 3)
+    np.testing.assert_allclose(ic["bas"], bas, atol=1e-9)
+    np.testing.assert_allclose(ic["haut"], haut, atol=1e-9)
+    observe = [df[a].astype("float64").corr(df[b].astype("float64")) for a, b in PAIRES_CONCLUSIONS]
+    np.testing.assert_allclose(ic["r"], observe, atol=1e-9)
+
+
+def test_processus_identiques_au_sequentiel(df, monkeypatch):
+    paires = all_pairs(["Sommeil_moyen", "Stress", "Energie", "Cafe"])
+    monkeypatch.setattr(bootstrap, "LOT_ELEMENTS", 50 * len(df))
+    sequentiel = bootstrap_corr(df, paires, tirages=400)
+    monkeypatch.setattr(bootstrap, "SEUIL_PROCESSUS", 1)
+    pd.testing.assert_frame_equal(bootstrap_corr(df, paires, tirages=400), sequentiel)
+
+
+def test_trop_peu_de_lignes(df):
+    ic = bootstrap_corr(df.iloc[:2], PAIRES_CONCLUSIONS)
+    assert ic.isna().all().all()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cohortes import Cube, filter_options
+from src.preprocessing import clean_rows, finalize
+
+
+@pytest.fixture
+def donnees(brut):
+    df, corr, _, _ = finalize(clean_rows(brut))
+    return df, list(corr.columns)
+
+
+def _selections(cube):
+    situations = cube.modalites["Situation"]
+    return [
+        {},
+        {"Situation": situations[:1]},
+        {"Situation": situations[:2], "Frequence_sport": cube.modalites["Frequence_sport"][1:3]},
+        {"Age": cube.modalites["Age"][-1:], "Definition_productivite": cube.modalites["Definition_productivite"][:1]},
+    ]
+
+
+def _filtrer(df, selection):
+    masque = np.ones(len(df), dtype=bool)
+    for f, valeurs in selection.items():
+        masque &= df[f].isin(valeurs).to_numpy()
+    return df[masque]
+
+
+def test_options_sans_cube(donnees):
+    df, colonnes = donnees
+    cube = Cube(df, colonnes)
+    assert filter_options(df) == cube.modalites
+
+
+def test_cube_identique_au_filtrage(donnees):
+    df, colonnes = donnees
+    cube = Cube(df, colonnes)
+    for selection in _selections(cube):
+        attendu = _filtrer(df, selection)
+        np.testing.assert_array_equal(df[cube.mask(selection)].index, attendu.index)
+
+        moments = cube.moments(selection)
+        x = attendu[colonnes].astype("float64")
+        assert moments.n == len(attendu)
+        np.testing.assert_allclose(moments.means(), x.mean(), rtol=1e-9)
+        np.testing.assert_allclose(moments.min, x.min())
+        np.testing.assert_allclose(moments.max, x.max())
+        pd.testing.assert_frame_equal(moments.corr(), x.corr(), check_exact=False, atol=1e-9)
+
+        moyennes = cube.means(selection, "Frequence_sport")
+        groupby = x.groupby(attendu["Frequence_sport"], observed=True).mean()
+        pd.testing.assert_frame_equal(moyennes, groupby, check_exact=False, rtol=1e-9, check_index_type=False)
+
+        profil = cube.profile(selection, moments)
+        parts = attendu["Situation"].value_counts(normalize=True)
+        assert profil.loc["Situation", "part_mode"] == pytest.approx(parts.max())
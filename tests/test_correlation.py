@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from src import correlation
+from src.correlation import permutation_pvalues, rank_correlation
+from src.preprocessing import clean_rows, finalize
+
+COLONNES = ["Sommeil_moyen", "Sommeil_nuit_derniere", "Stress", "Efficacite_aujourdhui", "Energie"]
+
+
+@pytest.fixture
+def df(brut):
+    return finalize(clean_rows(brut))[0][COLONNES].astype("float64").iloc[:300]
+
+
+def _permutations_naives(df, permutations, lot, graine):
+    # Paire par paire, mêmes ordres que permutation_pvalues : chaque ordre
+    # donne deux tirages, (i, j[π]) et (j, i[π]).
+    x = df.to_numpy()
+    n, k = x.shape
+    rng = np.random.default_rng(graine)
+    ordres = np.concatenate([
+        rng.permuted(np.tile(np.arange(n, dtype="int32"), (min(lot, permutations - d), 1)), axis=1)
+        for d in range(0, permutations, lot)
+    ])
+    p = np.zeros((k, k))
+    for i in range(k):
+        for j in range(i + 1, k):
+            observe = abs(np.corrcoef(x[:, i], x[:, j])[0, 1]) - 1e-12
+            depassements = sum(
+                int(abs(np.corrcoef(x[:, i], x[o, j])[0, 1]) >= observe)
+                + int(abs(np.corrcoef(x[:, j], x[o, i])[0, 1]) >= observe)
+                for o in ordres
+            ) / 2
+            p[i, j] = p[j, i] = (1 + depassements) / (1 + permutations)
+    return pd.DataFrame(p, index=df.columns, columns=df.columns)
+
+
+def test_permutations_identiques_a_la_boucle_naive(df, monkeypatch):
+    # Sans arrêt anticipé, chaque paire voit toutes les permutations.
+    monkeypatch.setattr(correlation, "RISQUE_ARRET", 0.0)
+    monkeypatch.setattr(correlation, "PERMUTATIONS_LOT", 40)
+    obtenu = permutation_pvalues(df, permutations=200, graine=5)
+    pd.testing.assert_frame_equal(obtenu, _permutations_naives(df, 200, 40, 5))
+
+
+def test_arret_anticipe_garde_la_decision(df, monkeypatch):
+    rapide = permutation_pvalues(df, permutations=2_000, graine=1)
+    pd.testing.assert_frame_equal(permutation_pvalues(df, permutations=2_000, graine=1), rapide)
+    monkeypatch.setattr(correlation, "RISQUE_ARRET", 0.0)
+    complet = permutation_pvalues(df, permutations=2_000, graine=1)
+    assert ((rapide < 0.05) == (complet < 0.05)).all().all()
+
+
+@pytest.fixture
+def continu(brut_continu):
+    colonnes = ["Eau_litres", "Sommeil_moyen", "Energie", "Stress"]
+    return finalize(clean_rows(brut_continu))[0][colonnes].astype("float64").iloc[:2_000]
+
+
+def _scipy(df, fonction):
+    k = df.shape[1]
+    r, p = np.eye(k), np.zeros((k, k))
+    for i in range(k):
+        for j in range(i + 1, k):
+            res = fonction(df.iloc[:, i], df.iloc[:, j])
+            r[i, j] = r[j, i] = res.statistic
+            p[i, j] = p[j, i] = res.pvalue
+    return (pd.DataFrame(r, index=df.columns, columns=df.columns),
+            pd.DataFrame(p, index=df.columns, columns=df.columns))
+
+
+@pytest.mark.parametrize("donnees", ["df", "continu"])
+def test_spearman_comme_scipy(donnees, request):
+    donnees = request.getfixturevalue(donnees)
+    rho, p = rank_correlation(donnees, "spearman")
+    rho_ref, p_ref = _scipy(donnees, stats.spearmanr)
+    pd.testing.assert_frame_equal(rho, rho_ref, check_exact=False, atol=1e-12)
+    pd.testing.assert_frame_equal(p, p_ref, check_exact=False, rtol=1e-8, atol=1e-300)
+
+
+@pytest.mark.parametrize("table_max", [correlation.KENDALL_TABLE_MAX, 0], ids=["table", "tri"])
+@pytest.mark.parametrize("donnees", ["df", "continu"])
+def test_kendall_comme_scipy(donnees, table_max, request, monkeypatch):
+    # Les deux chemins (table de contingence, tri et inversions) sur des
+    # échelles à ex aequo et sur des colonnes continues.
+    monkeypatch.setattr(correlation, "KENDALL_TABLE_MAX", table_max)
+    monkeypatch.setattr(correlation, "KENDALL_LOT_ELEMENTS", 3_000)
+    donnees = request.getfixturevalue(donnees)
+    tau, p = rank_correlation(donnees, "kendall")
+    tau_ref, p_ref = _scipy(donnees, stats.kendalltau)
+    pd.testing.assert_frame_equal(tau, tau_ref, check_exact=False, atol=1e-12)
+    pd.testing.assert_frame_equal(p, p_ref, check_exact=False, rtol=1e-8, atol=1e-300)
+
+
+def test_pvalues_pearson_comme_scipy(df):
+    corr = df.corr()
+    p = correlation.pearson_pvalues(corr, correlation.pairwise_counts(df))
+    _, p_ref = _scipy(df, stats.pearsonr)
+    pd.testing.assert_frame_equal(p, p_ref, check_exact=False, rtol=1e-8, atol=1e-300)
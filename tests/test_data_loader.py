@@ -0,0 +1,31 @@
+import unicodedata
+
+import pandas as pd
+import pytest
+
+from src.data_loader import RENAME_MAP, check_headers, normalize_columns
+
+
+def _export(entetes):
+    return pd.DataFrame([range(len(entetes))], columns=list(entetes))
+
+
+def test_colonne_manquante_leve_valueerror():
+    entetes = [k for k, v in RENAME_MAP.items() if v != "Stress"]
+    with pytest.raises(ValueError, match="Stress"):
+        normalize_columns(_export(entetes))
+    assert check_headers(entetes) == ([], ["Stress"])
+
+
+def test_entete_inconnu_signale_et_les_autres_renommes():
+    # Variantes vues dans les exports : apostrophes typographiques, forme
+    # décomposée des accents, espaces en trop.
+    variantes = {
+        k: unicodedata.normalize("NFD", f"  {k.replace(chr(39), chr(0x2019))} ").replace(" ", "  ")
+        for k in RENAME_MAP
+    }
+    entetes = list(variantes.values()) + ["Commentaire libre"]
+    with pytest.warns(UserWarning, match="Commentaire libre"):
+        df = normalize_columns(_export(entetes))
+    assert list(df.columns[:-1]) == list(RENAME_MAP.values())
+    assert df.columns[-1] == "commentaire libre"
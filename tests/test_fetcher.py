@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from generateur import generer
+from serveur_csv import creer_serveur
+from src.fetcher import SheetFetcher
+
+
+def _demarrer(serveur):
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{serveur.server_address[1]}/export.csv"
+
+
+@pytest.fixture
+def export(tmp_path):
+    chemin = tmp_path / "export.csv"
+    generer(200, seed=5).to_csv(chemin, index=False)
+    return chemin
+
+
+@pytest.fixture
+def serveur(export, request):
+    validateurs, croissance = request.param
+    serveur = creer_serveur(export, depart=100, croissance=croissance, validateurs=validateurs)
+    yield serveur, _demarrer(serveur)
+    serveur.shutdown()
+    serveur.server_close()
+
+
+@pytest.mark.parametrize("serveur", [(True, 0)], indirect=True)
+def test_304_renvoie_le_corps_en_cache(serveur):
+    serveur, url = serveur
+    fetcher = SheetFetcher()
+    premiere = fetcher.fetch(url)
+    seconde = fetcher.fetch(url)
+    assert premiere.modifie and not seconde.modifie
+    assert seconde.contenu is premiere.contenu
+    assert seconde.empreinte == hashlib.sha256(premiere.contenu).hexdigest()
+    assert serveur.stats["non_modifies"] == 1 and fetcher.stats()["non_modifies"] == 1
+    # Keep-alive : les deux requêtes passent par la même connexion.
+    assert serveur.stats["connexions"] == 1 and fetcher.stats()["connexions"] == 1
+
+
+@pytest.mark.parametrize("serveur", [(True, 5), (False, 5)], indirect=True)
+def test_corps_modifie_retelecharge(serveur):
+    serveur, url = serveur
+    fetcher = SheetFetcher()
+    premiere = fetcher.fetch(url)
+    seconde = fetcher.fetch(url)
+    assert seconde.modifie
+    assert len(seconde.contenu.splitlines()) == len(premiere.contenu.splitlines()) + 5
+    assert seconde.empreinte == hashlib.sha256(seconde.contenu).hexdigest()
+    assert serveur.stats["non_modifies"] == 0
+
+
+@pytest.mark.parametrize("serveur", [(False, 0)], indirect=True)
+def test_sans_validateurs_compare_le_sha256(serveur):
+    serveur, url = serveur
+    fetcher = SheetFetcher()
+    premiere = fetcher.fetch(url)
+    seconde = fetcher.fetch(url)
+    assert serveur.stats["requetes"] == 2
+    assert not seconde.modifie and seconde.contenu is premiere.contenu
+
+
+def test_redirection_et_gzip(export):
+    corps = export.read_bytes()
+
+    class Gestionnaire(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path != "/export.csv":
+                self.send_response(302)
+                self.send_header("Location", "/export.csv")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            compresse = gzip.compress(corps)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(compresse)))
+            self.end_headers()
+            self.wfile.write(compresse)
+
+        def log_message(self, *args):
+            pass
+
+    serveur = ThreadingHTTPServer(("127.0.0.1", 0), Gestionnaire)
+    url = _demarrer(serveur).replace("/export.csv", "/ancien")
+    try:
+        reponse = SheetFetcher().fetch(url)
+    finally:
+        serveur.shutdown()
+        serveur.server_close()
+    assert reponse.contenu == corps
+    assert reponse.empreinte == hashlib.sha256(corps).hexdigest()
@@ -0,0 +1,41 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from src import figure_cache
+from src.figure_cache import FigureCache
+
+
+def _figure(df: pd.DataFrame, couleur: str = "C0") -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(1, 1))
+    ax.plot(df.iloc[:, 0].to_numpy()[:10], color=couleur)
+    return fig
+
+
+def test_eviction_lru_et_compteurs():
+    cache = FigureCache(max_octets=300)
+    cles = [("f", str(k)) for k in range(4)]
+    for cle in cles[:3]:
+        cache.put(cle, b"x" * 100)
+    # La plus ancienne, une fois réécrite, n'est plus la prochaine évincée.
+    cache.put(cles[0], b"x" * 100)
+    cache.put(cles[3], b"x" * 100)
+    assert not cache.contains(cles[1])
+    assert all(cache.contains(c) for c in (cles[0], cles[2], cles[3]))
+    stats = cache.stats()
+    assert (stats["evictions"], stats["entrees"], stats["octets"]) == (1, 3, 300)
+
+
+def test_hits_misses_par_version_et_parametres():
+    cache = FigureCache()
+    df = pd.DataFrame({"x": np.arange(figure_cache.EMPREINTE_MAX_CELLULES + 1.0)})
+    png = cache.get(_figure, df, version="v1")
+    # Même version : le frame n'est pas re-hashé, une copie est servie
+    # depuis le cache.
+    assert cache.get(_figure, df.copy(), version="v1") is png
+    cache.get(_figure, df, version="v2")
+    cache.get(_figure, df, version="v1", couleur="C1")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+    assert stats["hit_rate"] == 0.25
+    assert not plt.get_fignums()
@@ -0,0 +1,36 @@
+import hashlib
+
+import pandas as pd
+
+from generateur import generer
+from src.data_loader import normalize_columns
+from src.ingestion import current_moments, ingest
+from src.preprocessing import clean_rows, finalize
+
+
+def _comparer(obtenu, brut):
+    attendu = finalize(clean_rows(normalize_columns(brut)))
+    for a, b in zip(attendu, obtenu):
+        pd.testing.assert_frame_equal(a, b, check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_ajouts_successifs_identiques_au_jeu_complet(tmp_path):
+    brut = generer(2_000, seed=7)
+    export, store = tmp_path / "export.csv", tmp_path / "store"
+    for lignes in (500, 500, 1_200, 2_000):
+        brut.iloc[:lignes].to_csv(export, index=False)
+        sorties, version = ingest(str(export), store)
+        _comparer(sorties, brut.iloc[:lignes])
+        assert version == hashlib.sha256(export.read_bytes()).hexdigest()
+    assert current_moments(store).n == 2_000
+    assert len(pd.read_csv(store / "brut.csv")) == 2_000
+
+
+def test_export_reecrit_repart_de_zero(tmp_path):
+    brut = generer(1_000, seed=8)
+    export, store = tmp_path / "export.csv", tmp_path / "store"
+    brut.to_csv(export, index=False)
+    ingest(str(export), store)
+    # Lignes supprimées en tête : le store ne correspond plus à l'export.
+    brut.iloc[300:].to_csv(export, index=False)
+    _comparer(ingest(str(export), store)[0], brut.iloc[300:].reset_index(drop=True))
@@ -0,0 +1,26 @@
+from src.instrumentation import end_rerun, span, start_rerun
+
+
+def _rerun(chemin, max_octets):
+    start_rerun()
+    with span("etape"):
+        pass
+    return end_rerun(chemin, max_octets)
+
+
+def test_export_tourne_au_dela_de_la_taille_max(tmp_path):
+    chemin = tmp_path / "spans.jsonl"
+    _rerun(chemin, 10**6)
+    # Un span par rerun, une ligne chacun : rotation dès deux lignes écrites.
+    max_octets = chemin.stat().st_size * 3 // 2
+    for _ in range(4):
+        _rerun(chemin, max_octets)
+    assert len(chemin.read_text().splitlines()) == 1
+    assert len((tmp_path / "spans.jsonl.1").read_text().splitlines()) == 2
+
+
+def test_export_desactive(tmp_path):
+    chemin = tmp_path / "spans.jsonl"
+    spans = _rerun(chemin, 0)
+    assert [s.nom for s in spans] == ["etape"]
+    assert not chemin.exists()
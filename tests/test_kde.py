@@ -0,0 +1,12 @@
+import numpy as np
+from scipy import stats
+
+from src.kde import binned_kde
+
+
+def test_kde_binnee_proche_de_gaussian_kde():
+    x = np.random.default_rng(0).normal(6.5, 1.2, 3_000).round(1)
+    grille, densite = binned_kde(x)
+    reference = stats.gaussian_kde(x, bw_method="scott")(grille)
+    assert np.abs(densite - reference).max() < 1e-3 * reference.max()
+    assert abs(np.trapezoid(densite, grille) - 1) < 1e-3
@@ -0,0 +1,44 @@
+import threading
+
+import pandas as pd
+
+from src import metrics
+from src.metrics import MetricRegistry
+
+
+def test_prechauffage_calcule_une_seule_fois(monkeypatch):
+    # La page qui demande la métrique pendant le calcul en arrière-plan
+    # attend le résultat au lieu de relancer le bootstrap.
+    appels, demarre, libere = [], threading.Event(), threading.Event()
+
+    def bootstrap_lent(df, paires):
+        appels.append(len(df))
+        demarre.set()
+        libere.wait(5)
+        return "ic"
+
+    monkeypatch.setattr(metrics, "bootstrap_corr", bootstrap_lent)
+    registre = MetricRegistry()
+    registre._definitions = metrics.registry._definitions
+    df = pd.DataFrame({"x": range(10)})
+
+    assert registre.warm_up("v1", df=df)
+    assert not registre.warm_up("v1", df=df)
+    assert demarre.wait(5)
+    threading.Timer(0.2, libere.set).start()
+    assert registre.bind("v1", df=df)["ic_conclusions"] == "ic"
+    assert appels == [10]
+
+
+def test_selections_ne_chassent_pas_la_version_de_base(monkeypatch):
+    monkeypatch.setattr(metrics, "SELECTIONS_MAX", 2)
+    registre = MetricRegistry()
+    registre._definitions = metrics.registry._definitions
+    df = pd.DataFrame({"x": range(10)})
+    base = registre.bind("v1", df=df, selection={})
+    assert base["n"] == 10
+    for k in range(metrics.VERSIONS_MAX + 3):
+        selection = {"Age": [str(k)]}
+        registre.bind(f"v1:{selection!r}", df=df.iloc[:k], selection=selection)["n"]
+    assert "n" in registre.bind("v1", df=df, selection={}).computed()
+    assert len(registre._selections) == 2
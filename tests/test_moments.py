@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from src.moments import Moments
+
+
+def test_lots_et_fusions_comme_pandas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(1e3, 5, (5_000, 4)), columns=list("abcd"))
+    df["d"] = df["a"] * 0.3 + rng.normal(0, 1, len(df))
+    cumules = Moments(df.columns)
+    for debut in range(0, len(df), 700):
+        cumules.add(df.iloc[debut:debut + 700])
+    fusionnes = Moments.from_frame(df.iloc[:1_234]).merge(Moments.from_frame(df.iloc[1_234:]))
+    for moments in (cumules, fusionnes):
+        assert moments.n == len(df)
+        np.testing.assert_allclose(moments.means(), df.mean(), rtol=1e-12)
+        np.testing.assert_allclose(moments.var(), df.var(), rtol=1e-9)
+        pd.testing.assert_frame_equal(moments.corr(), df.corr(), check_exact=False, atol=1e-9)
+        np.testing.assert_array_equal(moments.min, df.min())
+        np.testing.assert_array_equal(moments.max, df.max())
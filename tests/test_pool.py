@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import RACINE
+
+# Script sans garde `if __name__ == "__main__"`, comme main.py sous
+# Streamlit : chaque exécution laisse un fichier marqueur à son pid.
+SCRIPT = """
+import os, sys
+sys.path.insert(0, {racine!r})
+open(os.path.join({dossier!r}, str(os.getpid())), "w").write(__name__)
+from src.pool import process_pool
+pool = process_pool(2)
+resultats = [*pool.map(abs, [-1, -2, -3]), pool.submit(abs, -4).result()]
+pool.shutdown()
+print(sum(resultats))
+"""
+
+
+@pytest.mark.parametrize("stdin", [False, True], ids=["fichier", "stdin"])
+def test_workers_ne_relancent_pas_le_script(tmp_path, stdin):
+    marqueurs = tmp_path / "marqueurs"
+    marqueurs.mkdir()
+    script = tmp_path / "script.py"
+    script.write_text(SCRIPT.format(racine=str(RACINE), dossier=str(marqueurs)))
+
+    if stdin:
+        sortie = subprocess.run([sys.executable, "-"], input=script.read_text(),
+                                capture_output=True, text=True, timeout=60, cwd=tmp_path)
+    else:
+        sortie = subprocess.run([sys.executable, str(script)],
+                                capture_output=True, text=True, timeout=60, cwd=tmp_path)
+
+    assert sortie.returncode == 0, sortie.stderr
+    assert int(sortie.stdout) == 10
+    assert [p.read_text() for p in marqueurs.iterdir()] == ["__main__"]
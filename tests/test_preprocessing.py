@@ -0,0 +1,91 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import preprocessing
+from src.preprocessing import BORNES, COLONNES_PARSEES, clean_rows, finalize
+
+
+def _reference(df: pd.DataFrame) -> pd.DataFrame:
+    # Bornage et imputation colonne par colonne, en pandas : médiane des
+    # valeurs bornées pour les valeurs hors bornes, puis mode (le plus petit)
+    # pour les manquantes.
+    df = df.copy()
+    for col in df.select_dtypes(include=np.number).columns:
+        x = df[col].astype("float64")
+        if col in BORNES:
+            bas, haut = BORNES[col]
+            hors = (x < bas) | (x > haut)
+            x = x.clip(bas, haut)
+            x[hors] = x.median()
+        mode = x.mode()
+        df[col] = x.fillna(mode[0] if not mode.empty else 0)
+    return df
+
+
+def test_finalize_exact_au_dela_des_esquisses(brut_continu):
+    propres = clean_rows(brut_continu)
+    assert propres["Eau_litres"].nunique() > 4096
+    df, corr, _, profil = finalize(propres)
+    attendu = _reference(propres)
+    for col in ("Eau_litres", "Sommeil_moyen", "Stress", "Cafe"):
+        np.testing.assert_allclose(df[col].astype("float64"), attendu[col].astype("float32"), rtol=0)
+        assert profil.loc[col, "mediane"] == attendu[col].median()
+        assert profil.loc[col, "mode"] == attendu[col].mode()[0]
+        assert profil.loc[col, "part_mode"] == (attendu[col] == attendu[col].mode()[0]).mean()
+    pd.testing.assert_frame_equal(corr, attendu[corr.columns].corr(), atol=1e-12)
+
+
+# Parseurs d'origine, une réponse à la fois (Series.apply / map).
+PARSEURS_LIGNE = {
+    "sommeil":  preprocessing._convertir_sommeil,
+    "sport":    lambda val: preprocessing.FREQ_MAP.get(val, np.nan),
+    "efficace": lambda val: preprocessing.PROD_MAP.get(val, np.nan),
+    "stress":   lambda val: preprocessing._parse_mixed(val, preprocessing.STRESS_MAP),
+    "eau":      preprocessing._nettoyer_eau,
+}
+
+
+def _ligne_par_ligne(series: pd.Series, nom: str) -> np.ndarray:
+    return np.array([PARSEURS_LIGNE[nom](v) for v in series], dtype="float64")
+
+
+@pytest.mark.parametrize("vocabulaire_max", [100_000, 50])
+def test_vocabulaire_sur_lots_chevauchants(brut, monkeypatch, vocabulaire_max):
+    # Second lot : moitié de réponses déjà vues, moitié nouvelles ; avec un
+    # petit plafond, le vocabulaire est purgé entre les deux.
+    monkeypatch.setattr(preprocessing, "_vocabulaires", {})
+    monkeypatch.setattr(preprocessing, "VOCABULAIRE_MAX", vocabulaire_max)
+    for lot in (brut.iloc[:1_500], brut.iloc[750:]):
+        for col, nom in COLONNES_PARSEES.items():
+            obtenu = preprocessing._parser_par_vocabulaire(lot[col], nom)
+            np.testing.assert_array_equal(obtenu.to_numpy(), _ligne_par_ligne(lot[col], nom))
+            assert obtenu.index.equals(lot.index)
+
+
+def test_vocabulaire_partage_entre_threads(brut, monkeypatch):
+    # Plafond bas : les purges d'un thread tombent pendant les lectures des
+    # autres.
+    monkeypatch.setattr(preprocessing, "_vocabulaires", {})
+    monkeypatch.setattr(preprocessing, "VOCABULAIRE_MAX", 30)
+    attendus = {col: _ligne_par_ligne(brut[col], nom) for col, nom in COLONNES_PARSEES.items()}
+    erreurs = []
+
+    def parser(debut):
+        try:
+            for _ in range(20):
+                for col, nom in COLONNES_PARSEES.items():
+                    lot = brut[col].iloc[debut:debut + 400]
+                    obtenu = preprocessing._parser_par_vocabulaire(lot, nom).to_numpy()
+                    np.testing.assert_array_equal(obtenu, attendus[col][debut:debut + 400])
+        except Exception as e:
+            erreurs.append(e)
+
+    threads = [threading.Thread(target=parser, args=(debut,)) for debut in range(0, 2_400, 300)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not erreurs
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.sketches import PRECISION, ColumnSketch, Frequences, QuantileSketch
+
+
+@pytest.fixture
+def valeurs():
+    rng = np.random.default_rng(0)
+    x = np.round(rng.lognormal(1, 0.3, 20_000), 4)
+    x[:100] *= -1
+    return x
+
+
+def test_frequences_exactes():
+    x = np.random.default_rng(1).integers(0, 12, 5_000) / 2
+    esquisse = Frequences().add(x[:2_000]).merge(Frequences().add(x[2_000:]))
+    assert esquisse.quantile(0.5) == np.median(x)
+    assert esquisse.quantile(0.9) == pytest.approx(np.quantile(x, 0.9))
+    assert esquisse.mode() == pd.Series(x).mode()[0]
+
+
+def test_quantiles_a_precision_relative(valeurs):
+    esquisse = QuantileSketch().add(valeurs)
+    for q in (0.1, 0.5, 0.9):
+        assert esquisse.quantile(q) == pytest.approx(np.quantile(valeurs, q), rel=2 * PRECISION)
+
+
+def test_mode_est_une_valeur_observee(valeurs):
+    esquisse = QuantileSketch().add(valeurs[:7_000]).merge(QuantileSketch().add(valeurs[7_000:]))
+    mode = esquisse.mode()
+    assert mode in set(valeurs)
+    assert mode == QuantileSketch().add(valeurs).mode()
+
+
+def test_bascule_vers_esquisse(valeurs):
+    colonne = ColumnSketch(frequences_max=100).add(valeurs[:50])
+    assert colonne.exact
+    colonne.merge(ColumnSketch().add(valeurs[50:]))
+    assert not colonne.exact
+    assert colonne.n == len(valeurs)
+    assert colonne.mode() in set(valeurs)
@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from generateur import generer
+from src.preprocessing import clean_rows, finalize
+from src.streaming import preprocess_chunks, preprocess_stream
+
+
+def _morceaux(df: pd.DataFrame, taille: int):
+    for debut in range(0, len(df), taille):
+        yield df.iloc[debut:debut + taille].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("taille", [64, 500, 10_000])
+def test_morceaux_identiques_au_bloc(brut, taille):
+    attendu = finalize(clean_rows(brut))
+    obtenu = preprocess_chunks(_morceaux(brut, taille))
+    for a, b in zip(attendu, obtenu):
+        pd.testing.assert_frame_equal(a, b, check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_lecture_csv_par_blocs(brut, tmp_path):
+    chemin = tmp_path / "export.csv"
+    generer(3_000, seed=3).to_csv(chemin, index=False)
+    attendu = finalize(clean_rows(brut))
+    obtenu = preprocess_stream(chemin.read_bytes(), 700)
+    for a, b in zip(attendu, obtenu):
+        pd.testing.assert_frame_equal(a, b, check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_esquisses_proches_au_dela_des_tables_exactes(brut_continu):
+    # Au-delà de FREQUENCES_MAX valeurs distinctes, médianes et modes viennent
+    # d'esquisses : le résultat reste proche du bloc, sans être identique.
+    df, corr, _, _ = finalize(clean_rows(brut_continu))
+    df_m, corr_m, _, profil_m = preprocess_chunks(_morceaux(brut_continu, 1_000))
+    assert profil_m.loc["Eau_litres", "mode"] in set(clean_rows(brut_continu)["Eau_litres"])
+    assert (corr - corr_m).abs().max().max() < 0.01
+    mediane = df["Eau_litres"].median()
+    assert abs(df_m["Eau_litres"].median() - mediane) <= 0.01 * mediane
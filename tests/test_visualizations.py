@@ -0,0 +1,15 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.visualizations import COEFFICIENTS, plot_correlation
+
+
+@pytest.mark.parametrize("method", list(COEFFICIENTS))
+def test_pied_de_la_matrice_suit_la_methode(method):
+    colonnes = ["Stress", "Energie", "Cafe"]
+    corr = pd.DataFrame(np.eye(3), index=colonnes, columns=colonnes)
+    fig = plot_correlation(corr, corr * 0, method=method)
+    textes = [t.get_text() for t in fig.texts]
+    assert any(COEFFICIENTS[method] in t for t in textes)
+    assert not any("normalisées" in t for t in textes)